@@ -11,13 +11,13 @@ from django.urls import reverse
 from django.utils.encoding import force_bytes, force_str
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from django.utils.translation import gettext_lazy as _
+from geminn.pagination import CursorPaginator
 from inventory.models import Product
-from orders.models import Order
-from orders.views import user_orders
+from orders.history import order_history, order_history_page
 
 from .forms import UserRegistrationForm, CustomPasswordResetForm, UserAddressForm, UserEditForm
 from .models import Address, UserModel
-from inventory.models import ProductUnitImage
+from inventory.listings import product_listing
 from .tokens import account_activation_token, password_reset_token
 
 
@@ -151,7 +151,7 @@ def update_profile(request):
 
 @login_required
 def dashboard(request):
-    orders = user_orders(request)
+    orders = order_history(request.user)[:5]
     return render(request, 'accounts/dashboard/index.html', {
         'orders': orders
     })
@@ -229,21 +229,18 @@ def delete_address(request, id):
 
 @login_required
 def user_orders(request):
-    user_id = request.user.id
-    orders = Order.objects.filter(user_id=user_id).filter(billing_status=True)
-    return render(request, 'accounts/users/user_orders.html', {'orders': orders})
+    orders = order_history_page(request)
+    return render(request, 'accounts/users/user_orders.html', {'orders': orders, 'page': orders})
 
 
 # User Favorites
 
 @login_required
 def user_favorites(request):
-    favorites = Product.objects.filter(users_favorite=request.user)
+    favorites = CursorPaginator(product_listing(
+        users_favorite=request.user)).get_page(request)
 
-    product_unit_images = ProductUnitImage.objects.filter(
-        is_product_unit_default=True, is_active=True)
-
-    return render(request, 'accounts/users/user_favorites.html', {'favorites': favorites, 'product_unit_images': product_unit_images})
+    return render(request, 'accounts/users/user_favorites.html', {'favorites': favorites, 'page': favorites})
 
 
 @login_required
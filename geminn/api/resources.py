@@ -0,0 +1,158 @@
+from django.db import models
+from django.db.models import Prefetch
+
+from inventory.models import Product, ProductReview, ProductSpecification, ProductSpecificationValue, ProductUnit, ProductUnitImage
+
+
+class Include:
+    # lookup: relation traversed by prefetch_related. parent_field / child_field
+    # name the FK that must stay loaded under .only() for the join to work.
+    def __init__(self, lookup, resource, parent_field=None, child_field=None, many=True):
+        self.lookup = lookup
+        self.resource = resource
+        self.parent_field = parent_field
+        self.child_field = child_field
+        self.many = many
+
+
+class Resource:
+    def __init__(self, model, fields, default_fields=None, includes=None, filters=None,
+                 ordering=('id',)):
+        self.model = model
+        self.fields = tuple(fields)
+        self.default_fields = tuple(default_fields or fields)
+        self.includes = includes or {}
+        self.filters = filters or {}
+        self.ordering = ordering
+
+        # (name, attname, converter) per field, resolved once
+        self.columns = {}
+        for name in self.fields:
+            field = model._meta.get_field(name)
+            converter = _file_url if isinstance(field, models.FileField) else None
+            self.columns[name] = (field.attname, converter)
+
+    def queryset(self):
+        return self.model.objects.filter(is_active=True)
+
+    def parse_fields(self, value):
+        if not value:
+            return self.default_fields
+        fields = tuple(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+        unknown = [name for name in fields if name not in self.columns]
+        if unknown:
+            raise ValueError('Unknown field(s): {}'.format(', '.join(unknown)))
+        return fields
+
+    def parse_includes(self, value):
+        if not value:
+            return ()
+        includes = tuple(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+        unknown = [name for name in includes if name not in self.includes]
+        if unknown:
+            raise ValueError('Unknown include(s): {}'.format(', '.join(unknown)))
+        return includes
+
+    def loaded_fields(self, fields, includes=(), extra=()):
+        # Only the requested columns plus what pagination and joins need
+        ordering = [name.lstrip('-') for name in self.ordering]
+        joins = [self.includes[name].parent_field for name in includes
+                 if self.includes[name].parent_field]
+        return list(dict.fromkeys(['id', *fields, *ordering, *joins, *extra]))
+
+    def build(self, fields, includes, include_fields):
+        queryset = self.queryset().only(*self.loaded_fields(fields, includes))
+        for name in includes:
+            include = self.includes[name]
+            child = RESOURCES[include.resource]
+            child_queryset = child.queryset().only(*child.loaded_fields(
+                include_fields[name], extra=[include.child_field] if include.child_field else []))
+            if include.many:
+                child_queryset = child_queryset.order_by(*child.ordering)
+            queryset = queryset.prefetch_related(Prefetch(
+                include.lookup, queryset=child_queryset, to_attr='included_' + name))
+        return queryset
+
+    def serialize(self, obj, fields, includes=(), include_fields=None):
+        columns = self.columns
+        row = {'id': obj.pk}
+        for name in fields:
+            attname, converter = columns[name]
+            value = getattr(obj, attname)
+            row[name] = converter(value) if converter else value
+
+        for name in includes:
+            include = self.includes[name]
+            child = RESOURCES[include.resource]
+            related = getattr(obj, 'included_' + name)
+            if include.many:
+                row[name] = [child.serialize(item, include_fields[name]) for item in related]
+            else:
+                row[name] = child.serialize(related, include_fields[name]) if related else None
+        return row
+
+
+def _file_url(value):
+    return value.url if value else None
+
+
+RESOURCES = {
+    'products': Resource(
+        Product,
+        fields=('title', 'slug', 'description', 'category', 'sub_category', 'brand',
+                'retail_price', 'retail_price_unit', 'initial_discount_value',
+                'initial_discount_value_unit', 'rating_count', 'rating_average',
+                'created_at', 'updated_at'),
+        default_fields=('title', 'slug', 'category', 'sub_category', 'brand',
+                        'retail_price', 'retail_price_unit', 'rating_count',
+                        'rating_average', 'updated_at'),
+        includes={
+            'units': Include('productunit_set', 'units', child_field='product'),
+            'images': Include('product', 'images', child_field='product'),
+            'specifications': Include('productspecification_set', 'specifications', child_field='product'),
+            'reviews': Include('productreview_set', 'reviews', child_field='product'),
+        },
+        filters={'category': 'category_id', 'sub_category': 'sub_category_id', 'brand': 'brand_id'},
+        ordering=('-updated_at', 'id'),
+    ),
+    'units': Resource(
+        ProductUnit,
+        fields=('title', 'slug', 'sku', 'description', 'retail_price', 'retail_price_unit',
+                'initial_discount_value', 'initial_discount_value_unit', 'sold',
+                'is_product_default', 'product', 'created_at', 'updated_at'),
+        default_fields=('title', 'slug', 'sku', 'retail_price', 'retail_price_unit',
+                        'sold', 'is_product_default', 'product', 'updated_at'),
+        includes={
+            'product': Include('product', 'products', parent_field='product', many=False),
+            'images': Include('product_unit_image', 'images', child_field='product_unit'),
+        },
+        filters={'product': 'product_id'},
+        ordering=('-updated_at', 'id'),
+    ),
+    'images': Resource(
+        ProductUnitImage,
+        fields=('image', 'slug', 'alt_text', 'product', 'product_unit',
+                'is_product_unit_default', 'updated_at'),
+        filters={'product': 'product_id', 'product_unit': 'product_unit_id'},
+    ),
+    'specifications': Resource(
+        ProductSpecification,
+        fields=('title', 'slug', 'product', 'updated_at'),
+        includes={
+            'values': Include('product_specification', 'specification_values',
+                              child_field='product_specification'),
+        },
+        filters={'product': 'product_id'},
+    ),
+    'specification_values': Resource(
+        ProductSpecificationValue,
+        fields=('value', 'slug', 'product', 'product_unit', 'product_specification', 'updated_at'),
+        filters={'product': 'product_id', 'product_unit': 'product_unit_id',
+                 'product_specification': 'product_specification_id'},
+    ),
+    'reviews': Resource(
+        ProductReview,
+        fields=('title', 'content', 'slug', 'stars', 'product', 'created_at', 'updated_at'),
+        filters={'product': 'product_id'},
+    ),
+}
@@ -0,0 +1,11 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('<slug:resource_name>/', views.resource_list, name='resource_list'),
+    path('<slug:resource_name>/<int:pk>/',
+         views.resource_detail, name='resource_detail'),
+]
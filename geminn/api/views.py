@@ -0,0 +1,91 @@
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from geminn.pagination import CursorPaginator
+
+from .resources import RESOURCES
+
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+
+
+def not_found(message='Not found'):
+    return JsonResponse({'error': message}, status=404)
+
+
+def parse_request(request, resource):
+    # ?fields=a,b  ?include=x,y  ?fields[x]=c,d
+    fields = resource.parse_fields(request.GET.get('fields'))
+    includes = resource.parse_includes(request.GET.get('include'))
+    include_fields = {
+        name: RESOURCES[resource.includes[name].resource].parse_fields(
+            request.GET.get('fields[{}]'.format(name)))
+        for name in includes
+    }
+    return fields, includes, include_fields
+
+
+def parse_filters(request, resource):
+    filters = {}
+    for name, lookup in resource.filters.items():
+        value = request.GET.get(name)
+        if value is None:
+            continue
+        if not value.isdigit():
+            raise ValueError('Filter "{}" expects an id'.format(name))
+        filters[lookup] = int(value)
+    return filters
+
+
+def parse_page_size(request):
+    value = request.GET.get('limit')
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    if not value.isdigit() or not 0 < int(value) <= MAX_PAGE_SIZE:
+        raise ValueError('"limit" must be between 1 and {}'.format(MAX_PAGE_SIZE))
+    return int(value)
+
+
+def page_url(request, query):
+    return request.build_absolute_uri(request.path + '?' + query) if query else None
+
+
+@require_GET
+def resource_list(request, resource_name):
+    resource = RESOURCES.get(resource_name)
+    if resource is None:
+        return not_found('Unknown resource')
+    try:
+        fields, includes, include_fields = parse_request(request, resource)
+        filters = parse_filters(request, resource)
+        per_page = parse_page_size(request)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+
+    queryset = resource.build(fields, includes, include_fields).filter(**filters)
+    page = CursorPaginator(queryset, ordering=resource.ordering,
+                           per_page=per_page).get_page(request)
+
+    return JsonResponse({
+        'data': [resource.serialize(obj, fields, includes, include_fields) for obj in page],
+        'next': page_url(request, page.next_query),
+        'previous': page_url(request, page.previous_query),
+    })
+
+
+@require_GET
+def resource_detail(request, resource_name, pk):
+    resource = RESOURCES.get(resource_name)
+    if resource is None:
+        return not_found('Unknown resource')
+    try:
+        fields, includes, include_fields = parse_request(request, resource)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+
+    obj = resource.build(fields, includes, include_fields).filter(pk=pk).first()
+    if obj is None:
+        return not_found()
+
+    return JsonResponse({'data': resource.serialize(obj, fields, includes, include_fields)})
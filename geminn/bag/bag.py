@@ -1,93 +1,208 @@
-from decimal import Decimal
+from django.core.files.storage import default_storage
+from django.db.models import OuterRef, Subquery
+from inventory.models import Product, ProductUnit, ProductUnitImage
+from checkout.options import delivery_options
+from geminn.money import Money
 
-from django.conf import settings
-from inventory.models import Product
-from checkout.models import DeliveryOptions
+from .pricing import current_prices
+from .stores import get_store, line_price
+
+
+class BagLine:
+    # Read-only view of one bag entry; the session dict is never touched
+    __slots__ = ('product', 'qty', 'price', 'total_price',
+                 'default_unit_id', 'default_unit_title', 'image')
+
+    def __init__(self, product, qty, price, default_unit_id=None, default_unit_title=None, image=None):
+        for name, value in (('product', product), ('qty', qty), ('price', price),
+                            ('total_price', price * qty), ('default_unit_id', default_unit_id),
+                            ('default_unit_title', default_unit_title), ('image', image)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('BagLine is immutable')
+
+    @property
+    def image_url(self):
+        return default_storage.url(self.image) if self.image else None
+
+
+def bag_products(product_ids):
+    # Products with their default unit and default image in one query
+    default_units = ProductUnit.objects.filter(
+        product=OuterRef('pk'), is_product_default=True, is_active=True).order_by('-updated_at', '-id')
+    default_images = ProductUnitImage.objects.filter(
+        product=OuterRef('pk'), is_product_unit_default=True, is_active=True).order_by('-updated_at', '-id')
+
+    return Product.objects.filter(id__in=product_ids).annotate(
+        default_unit_id=Subquery(default_units.values('id')[:1]),
+        default_unit_title=Subquery(default_units.values('title')[:1]),
+        default_image=Subquery(default_images.values('image')[:1]))
 
 
 class Bag:
     def __init__(self, request):
+        # Nothing is written until the bag is first changed
         self.session = request.session
-        bag = self.session.get(settings.BAG_SESSION_ID)
-        if settings.BAG_SESSION_ID not in request.session:
-            bag = self.session[settings.BAG_SESSION_ID] = {}
-        self.bag = bag
-
-    def add(self, product, qty):
+        self.store = get_store(request)
+        self.bag = self.store.load()
+        self._lines = None
+
+    @property
+    def currency(self):
+        # A bag holds prices in one currency, set by its first line
+        for item in self.bag.values():
+            return line_price(item).currency
+        return None
+
+    def _line(self, price, qty, currency=None):
+        # Raises ValueError for a price in another currency than the bag's
+        currency = currency or self.currency
+        if currency is not None and price.currency != currency:
+            raise ValueError('Cannot add {} prices to a {} bag'.format(price.currency, currency))
+        return {"price": price.cents, "currency": price.currency, "qty": qty}
+
+    def add(self, product, qty, price=None):
+        # price: current Money price (see pricing.current_prices)
         product_id = str(product.id)
 
         if product_id in self.bag:
             self.bag[product_id]["qty"] = qty
         else:
-            self.bag[product_id] = {"price": str(
-                product.retail_price), "qty": qty}
-
-        self.save()
+            if price is None:
+                price = Money.from_decimal(product.retail_price, product.retail_price_unit)
+            self.bag[product_id] = self._line(price, qty)
+
+        self.save(product_id)
+
+    def apply(self, operations, prices):
+        # operations: (op, product id, qty) tuples already validated;
+        # prices: {product id: Money} for every "add". Persisted once, and
+        # nothing is applied when an added price is in another currency.
+        currency = self.currency
+        added = {}
+        for op, product_id, qty in operations:
+            if op == "add" and str(product_id) not in self.bag:
+                added[str(product_id)] = self._line(prices[int(product_id)], qty, currency)
+                currency = currency or prices[int(product_id)].currency
+
+        saved, deleted = set(), set()
+        for op, product_id, qty in operations:
+            product_id = str(product_id)
+            if op == "add":
+                if product_id in self.bag:
+                    self.bag[product_id]["qty"] = qty
+                else:
+                    self.bag[product_id] = added[product_id]
+            elif product_id not in self.bag:
+                continue
+            elif op == "update":
+                self.bag[product_id]["qty"] = qty
+            else:
+                del self.bag[product_id]
+                saved.discard(product_id)
+                deleted.add(product_id)
+                continue
+            saved.add(product_id)
+            deleted.discard(product_id)
+
+        if saved or deleted:
+            self._lines = None
+            self.store.save_lines(self.bag, saved, deleted)
+
+    def revalidate(self):
+        # Reprice every line against current prices and discounts with one
+        # query; lines no longer for sale, or now priced in another currency
+        # than the rest of the bag, are dropped. Returns the changes.
+        prices = current_prices([int(product_id) for product_id in self.bag])
+        currency = self.currency if len(self.bag) > 1 else None
+        changes, saved, deleted = [], set(), set()
+
+        for product_id, item in list(self.bag.items()):
+            title, price = prices.get(int(product_id), (None, None))
+            old_price = line_price(item)
+            if price == old_price:
+                continue
+            if price is not None and currency not in (None, price.currency):
+                price = None
+            changes.append({"product_id": int(product_id), "title": title,
+                            "old_price": old_price, "new_price": price})
+            if price is None:
+                del self.bag[product_id]
+                deleted.add(product_id)
+            else:
+                item["price"], item["currency"] = price.cents, price.currency
+                saved.add(product_id)
+
+        if changes:
+            self._lines = None
+            self.store.save_lines(self.bag, saved, deleted)
+        return changes
+
+    def lines(self):
+        # Hydrated once per Bag; lines whose product is gone are skipped
+        if self._lines is None:
+            products = {str(product.id): product for product in bag_products(self.bag.keys())}
+            self._lines = [
+                BagLine(products[product_id], item["qty"], line_price(item),
+                        products[product_id].default_unit_id,
+                        products[product_id].default_unit_title,
+                        products[product_id].default_image)
+                for product_id, item in self.bag.items() if product_id in products
+            ]
+        return self._lines
 
     def __iter__(self):
-        product_ids = self.bag.keys()
-        products = Product.objects.filter(id__in=product_ids)
-        bag = self.bag.copy()
-
-        for product in products:
-            bag[str(product.id)]["product"] = product
-
-        for item in bag.values():
-            item["price"] = Decimal(item["price"])
-            item["total_price"] = item["price"] * item["qty"]
-            yield item
+        return iter(self.lines())
 
     def __len__(self):
-        return sum(item["qty"] for item in self.bag.values())
+        return self.get_totals()["qty"]
+
+    def get_totals(self):
+        return self.store.totals(self.bag)
 
     def update(self, product, qty):
         product_id = str(product)
         if product_id in self.bag:
             self.bag[product_id]["qty"] = qty
-        self.save()
+            self.save(product_id)
 
     def get_subtotal_price(self):
-        return sum(Decimal(item["price"]) * item["qty"] for item in self.bag.values())
+        totals = self.get_totals()
+        return Money(totals["subtotal"], totals["currency"])
 
     def get_delivery_price(self):
-        newprice = 0.00
+        # Delivery options carry no currency; they are charged in the bag's
+        newprice = Money(0, self.get_totals()["currency"])
 
         if "purchase" in self.session:
-            newprice = DeliveryOptions.objects.get(
-                id=self.session["purchase"]["delivery_id"]).delivery_price
+            newprice = Money.from_decimal(delivery_options.get(
+                self.session["purchase"]["delivery_id"]).delivery_price, newprice.currency)
 
         return newprice
 
     def get_total_price(self):
-        newprice = 0.00
-        subtotal = sum(Decimal(item["price"]) * item["qty"]
-                       for item in self.bag.values())
-
-        if "purchase" in self.session:
-            newprice = DeliveryOptions.objects.get(
-                id=self.session["purchase"]["delivery_id"]).delivery_price
-
-        total = subtotal + Decimal(newprice)
-        return total
+        return self.get_subtotal_price() + self.get_delivery_price()
 
     def bag_update_delivery(self, deliveryprice=0):
-        subtotal = sum(Decimal(item["price"]) * item["qty"]
-                       for item in self.bag.values())
-        total = subtotal + Decimal(deliveryprice)
-        return total
+        subtotal = self.get_subtotal_price()
+        return subtotal + Money.from_decimal(deliveryprice, subtotal.currency)
 
     def delete(self, product):
         product_id = str(product)
 
         if product_id in self.bag:
             del self.bag[product_id]
-            self.save()
+            self._lines = None
+            self.store.delete_line(self.bag, product_id)
 
     def clear(self):
-        del self.session[settings.BAG_SESSION_ID]
+        self.store.clear()
+        self.bag = {}
+        self._lines = None
         # del self.session["address"]
         # del self.session["purchase"]
-        self.save()
 
-    def save(self):
-        self.session.modified = True
+    def save(self, product_id):
+        self._lines = None
+        self.store.save_line(self.bag, product_id)
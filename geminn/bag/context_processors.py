@@ -1,5 +1,8 @@
+from django.utils.functional import SimpleLazyObject
+
 from .bag import Bag
 
 
 def bag(request):
-    return {'bag': Bag(request)}
+    # Built on first use, so templates that never touch the bag skip it
+    return {'bag': SimpleLazyObject(lambda: Bag(request))}
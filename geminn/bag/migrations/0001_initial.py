@@ -0,0 +1,38 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('inventory', '0004_product_rating_aggregates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BagItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.PositiveIntegerField(verbose_name='Price in cents when added')),
+                ('qty', models.PositiveIntegerField(default=1, verbose_name='Quantity')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bag_items', to='inventory.product')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bag_items', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Bag item',
+                'verbose_name_plural': 'Bag items',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='bagitem',
+            constraint=models.UniqueConstraint(fields=('user', 'product'), name='bag_item_user_product_unique'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bag', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bagitem',
+            name='currency',
+            field=models.CharField(default='USD', max_length=3, verbose_name='Currency of the price'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from accounts.models import UserModel
+from inventory.models import Product
+
+
+class BagItem(models.Model):
+    # One row per bag line when BAG_STORE = 'database'
+    user = models.ForeignKey(
+        UserModel, related_name='bag_items', on_delete=models.CASCADE)
+    product = models.ForeignKey(
+        Product, related_name='bag_items', on_delete=models.CASCADE)
+    price = models.PositiveIntegerField(
+        verbose_name=_('Price in cents when added'))
+    currency = models.CharField(
+        verbose_name=_('Currency of the price'), max_length=3, default=settings.DEFAULT_CURRENCY)
+    qty = models.PositiveIntegerField(verbose_name=_('Quantity'), default=1)
+    created_at = models.DateTimeField(
+        _('Created at'), auto_now_add=True, editable=False)
+    updated_at = models.DateTimeField(_('Updated at'), auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'product'], name='bag_item_user_product_unique'),
+        ]
+        verbose_name = _('Bag item')
+        verbose_name_plural = _('Bag items')
+
+    def __str__(self):
+        return str(self.id)
@@ -0,0 +1,48 @@
+from django.db.models import OuterRef, Subquery
+
+from geminn.money import Money
+from inventory.models import Product, ProductUnit
+
+
+def _discounted_price(price, currency, discount_value, discount_unit):
+    # A fixed discount recorded in another currency than the price raises
+    price_money = Money.from_decimal(price, currency)
+    if discount_value:
+        if discount_unit == 'PERC':
+            price_money -= Money.from_decimal(price * discount_value / 100, currency)
+        else:
+            price_money -= Money.from_decimal(discount_value, discount_unit or currency)
+    return max(price_money, Money(0, price_money.currency))
+
+
+def current_prices(product_ids):
+    # {product id: (title, Money)} for active, priced products, in the
+    # currency the price is recorded in. One query: each product with its
+    # default unit's price and initial discount; the unit's price wins over
+    # the product's when it has one.
+    default_unit = ProductUnit.objects.filter(
+        product=OuterRef('pk'), is_product_default=True, is_active=True).order_by('-updated_at', '-id')
+
+    rows = Product.objects.filter(id__in=product_ids, is_active=True).annotate(
+        unit_price=Subquery(default_unit.values('retail_price')[:1]),
+        unit_price_unit=Subquery(default_unit.values('retail_price_unit')[:1]),
+        unit_discount_value=Subquery(default_unit.values('initial_discount_value')[:1]),
+        unit_discount_unit=Subquery(default_unit.values('initial_discount_value_unit')[:1]),
+    ).values_list('id', 'title', 'retail_price', 'retail_price_unit', 'initial_discount_value',
+                  'initial_discount_value_unit', 'unit_price', 'unit_price_unit', 'unit_discount_value',
+                  'unit_discount_unit')
+
+    prices = {}
+    for (product_id, title, price, price_unit, discount_value, discount_unit,
+         unit_price, unit_price_unit, unit_discount_value, unit_discount_unit) in rows:
+        if unit_price is not None:
+            price, price_unit, discount_value, discount_unit = (
+                unit_price, unit_price_unit, unit_discount_value, unit_discount_unit)
+        elif price is None:
+            continue
+        try:
+            prices[product_id] = (title, _discounted_price(price, price_unit, discount_value, discount_unit))
+        except ValueError:
+            # Discount and price in different currencies: not sold until fixed
+            continue
+    return prices
@@ -0,0 +1,11 @@
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_in
+from django.dispatch import receiver
+
+from .stores import merge_session_bag
+
+
+@receiver(user_logged_in)
+def merge_bag_on_login(sender, request, user, **kwargs):
+    if settings.BAG_STORE == 'database' and request is not None:
+        merge_session_bag(request, user)
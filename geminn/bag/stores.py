@@ -0,0 +1,134 @@
+from django.conf import settings
+
+from geminn.money import Money
+from inventory.models import Product
+
+from .models import BagItem
+
+
+# A bag is a dict of {product id (str): {"price": cents, "currency": code,
+# "qty": n}}; stores only decide where it lives and how single-line changes
+# are written.
+
+def line_price(item):
+    # Lines saved before currencies were stored are in the default currency
+    return Money(item["price"], item.get("currency"))
+
+
+def bag_totals(bag):
+    # Summing through Money rejects a bag mixing currencies
+    qty, subtotal = 0, None
+    for item in bag.values():
+        qty += item["qty"]
+        line_total = line_price(item) * item["qty"]
+        subtotal = line_total if subtotal is None else subtotal + line_total
+    if subtotal is None:
+        subtotal = Money()
+    return {"qty": qty, "subtotal": subtotal.cents, "currency": subtotal.currency}
+
+
+class SessionBagStore:
+    def __init__(self, request):
+        self.session = request.session
+
+    def load(self):
+        bag = self.session.get(settings.BAG_SESSION_ID, {})
+
+        if any(isinstance(item["price"], str) for item in bag.values()):
+            # Bags saved before prices were stored in cents
+            for item in bag.values():
+                if isinstance(item["price"], str):
+                    item["price"] = Money.from_decimal(item["price"]).cents
+            self._save(bag)
+        return bag
+
+    def totals(self, bag):
+        # Cached next to the bag and refreshed on every change
+        totals = self.session.get(settings.BAG_TOTALS_SESSION_ID)
+        if totals is None or "currency" not in totals:
+            totals = bag_totals(bag)
+            if bag:
+                self.session[settings.BAG_TOTALS_SESSION_ID] = totals
+        return totals
+
+    def save_line(self, bag, product_id):
+        self._save(bag)
+
+    def delete_line(self, bag, product_id):
+        self._save(bag)
+
+    def save_lines(self, bag, saved_ids, deleted_ids):
+        self._save(bag)
+
+    def clear(self):
+        self.session.pop(settings.BAG_SESSION_ID, None)
+        self.session.pop(settings.BAG_TOTALS_SESSION_ID, None)
+
+    def _save(self, bag):
+        self.session[settings.BAG_SESSION_ID] = bag
+        self.session[settings.BAG_TOTALS_SESSION_ID] = bag_totals(bag)
+        self.session.modified = True
+
+
+class DatabaseBagStore:
+    # Per-line upserts instead of rewriting the whole session blob, and the
+    # bag follows the user across devices.
+    def __init__(self, user):
+        self.user = user
+
+    def load(self):
+        return {str(product_id): {"price": price, "currency": currency, "qty": qty}
+                for product_id, price, currency, qty in BagItem.objects.filter(
+                    user=self.user).order_by('id').values_list('product_id', 'price', 'currency', 'qty')}
+
+    def totals(self, bag):
+        return bag_totals(bag)
+
+    def upsert(self, bag):
+        BagItem.objects.bulk_create(
+            [BagItem(user=self.user, product_id=int(product_id), price=item["price"],
+                     currency=line_price(item).currency, qty=item["qty"])
+             for product_id, item in bag.items()],
+            update_conflicts=True, unique_fields=['user', 'product'],
+            update_fields=['price', 'currency', 'qty', 'updated_at'])
+
+    def save_line(self, bag, product_id):
+        self.upsert({product_id: bag[product_id]})
+
+    def delete_line(self, bag, product_id):
+        BagItem.objects.filter(user=self.user, product_id=int(product_id)).delete()
+
+    def save_lines(self, bag, saved_ids, deleted_ids):
+        if saved_ids:
+            self.upsert({product_id: bag[product_id] for product_id in saved_ids})
+        if deleted_ids:
+            BagItem.objects.filter(user=self.user, product_id__in=[
+                int(product_id) for product_id in deleted_ids]).delete()
+
+    def clear(self):
+        BagItem.objects.filter(user=self.user).delete()
+
+
+def get_store(request):
+    if settings.BAG_STORE == 'database' and request.user.is_authenticated:
+        return DatabaseBagStore(request.user)
+    return SessionBagStore(request)
+
+
+def merge_session_bag(request, user):
+    # Session lines win over stored ones for the same product, and over
+    # stored lines in another currency since a bag holds only one; everything
+    # is written with a single upsert.
+    session_store = SessionBagStore(request)
+    bag = session_store.load()
+    if not bag:
+        return
+
+    existing = {str(product_id) for product_id in Product.objects.filter(
+        id__in=[int(product_id) for product_id in bag]).values_list('id', flat=True)}
+    bag = {product_id: item for product_id, item in bag.items() if product_id in existing}
+    if bag:
+        currency = bag_totals(bag)["currency"]
+        BagItem.objects.filter(user=user).exclude(currency=currency).delete()
+        DatabaseBagStore(user).upsert(bag)
+    session_store.clear()
@@ -1,16 +1,18 @@
+import json
+
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, render
-from inventory.models import Product, ProductUnitImage
+from django.views.decorators.http import require_POST
+from inventory.models import Product
 
 from .bag import Bag
+from .pricing import current_prices
 
 
 def bag_summary(request):
     bag = Bag(request)
-    product_unit_images = ProductUnitImage.objects.filter(
-        is_product_unit_default=True, is_active=True)[:6]
 
-    return render(request, 'bag/summary.html', {'bag': bag, 'product_unit_images': product_unit_images})
+    return render(request, 'bag/summary.html', {'bag': bag})
 
 
 def bag_add(request):
@@ -19,7 +21,11 @@ def bag_add(request):
         product_id = int(request.POST.get('productid'))
         product_qty = int(request.POST.get('productqty'))
         product = get_object_or_404(Product, id=product_id)
-        bag.add(product=product, qty=product_qty)
+        title, price = current_prices([product_id]).get(product_id, (None, None))
+        try:
+            bag.add(product=product, qty=product_qty, price=price)
+        except ValueError:
+            return JsonResponse({'error': 'Bag holds {} prices'.format(bag.currency)}, status=400)
 
         bagqty = bag.__len__()
         response = JsonResponse({'qty': bagqty})
@@ -35,7 +41,7 @@ def bag_update(request):
 
         bagqty = bag.__len__()
         bagsubtotal = bag.get_subtotal_price()
-        response = JsonResponse({'qty': bagqty, 'subtotal': bagsubtotal})
+        response = JsonResponse({'qty': bagqty, 'subtotal': str(bagsubtotal)})
         return response
 
 
@@ -47,5 +53,53 @@ def bag_delete(request):
 
         bagqty = bag.__len__()
         bagtotal = bag.get_total_price()
-        response = JsonResponse({'qty': bagqty, 'subtotal': bagtotal})
+        response = JsonResponse({'qty': bagqty, 'subtotal': str(bagtotal)})
         return response
+
+
+BAG_OPERATIONS = ('add', 'update', 'delete')
+
+
+def parse_bag_operations(request):
+    # JSON body {"operations": [...]} or a form field holding the same list
+    if request.content_type == 'application/json':
+        payload = json.loads(request.body or b'{}')
+    else:
+        payload = {'operations': json.loads(request.POST.get('operations', '[]'))}
+
+    operations = []
+    for operation in payload.get('operations', []):
+        op = operation.get('op')
+        product_id = int(operation.get('productid'))
+        qty = int(operation.get('qty', 1))
+        if op not in BAG_OPERATIONS or qty < 1:
+            raise ValueError('Invalid operation')
+        operations.append((op, product_id, qty))
+    return operations
+
+
+@require_POST
+def bag_batch(request):
+    try:
+        operations = parse_bag_operations(request)
+    except (TypeError, ValueError, AttributeError):
+        return JsonResponse({'error': 'Invalid operations'}, status=400)
+
+    product_ids = {product_id for op, product_id, qty in operations if op == 'add'}
+    prices = {product_id: price for product_id, (title, price)
+              in current_prices(product_ids).items()} if product_ids else {}
+    missing = sorted(product_ids - prices.keys())
+    if missing:
+        return JsonResponse({'error': 'Unknown products', 'productids': missing}, status=400)
+
+    bag = Bag(request)
+    try:
+        bag.apply(operations, prices)
+    except ValueError:
+        return JsonResponse({'error': 'Bag holds {} prices'.format(bag.currency)}, status=400)
+
+    return JsonResponse({
+        'qty': len(bag),
+        'subtotal': str(bag.get_subtotal_price()),
+        'total': str(bag.get_total_price()),
+    })
@@ -0,0 +1,49 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from checkout import verification
+from orders.models import Order
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Verify PayPal orders still pending after the background verifier gave up'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=300,
+                            help='Only orders pending for at least this many seconds')
+        parser.add_argument('--every', type=int, default=0,
+                            help='Keep running, sweeping again after this many seconds')
+
+    def handle(self, *args, **options):
+        # Pending orders live in the database, so this sweep picks up every
+        # payment the in-process verifier lost to a restart or a crash
+        while True:
+            self.sweep(options['older_than'])
+            if not options['every']:
+                return
+            time.sleep(options['every'])
+            close_old_connections()
+
+    def sweep(self, older_than):
+        cutoff = timezone.now() - timedelta(seconds=older_than)
+        order_keys = Order.objects.filter(
+            payment_option='paypal', payment_status=Order.PENDING,
+            created_at__lte=cutoff).values_list('order_key', flat=True)
+
+        settled = 0
+        for order_key in list(order_keys):
+            try:
+                settled += verification.verify(order_key)
+            except Exception as error:
+                # One bad order must not hold up the ones after it
+                logger.exception('Could not verify PayPal order %s', order_key)
+                self.stderr.write('Could not verify {}: {}'.format(order_key, error))
+        self.stdout.write(self.style.SUCCESS('Settled {} pending payment(s)'.format(settled)))
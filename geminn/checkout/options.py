@@ -0,0 +1,49 @@
+import threading
+
+from inventory.versions import SharedVersion
+
+from .models import DeliveryOptions
+
+
+class ReferenceCache:
+    # Process-local copy of a small reference table, keyed by id. A save or
+    # delete in any process bumps the shared version and every process
+    # rebuilds on its next read after noticing. Cached instances are shared
+    # between requests and must not be modified.
+    def __init__(self, model, ordering, name):
+        self.model = model
+        self.ordering = ordering
+        self.version = SharedVersion(name)
+        self._lock = threading.Lock()
+        self._built_version = None
+        self._by_id = {}
+        self._active = ()
+
+    def invalidate(self):
+        self.version.bump()
+
+    def _ensure_built(self):
+        version = self.version.get()
+        if self._built_version == version:
+            return
+        with self._lock:
+            if self._built_version != version:
+                rows = list(self.model.objects.order_by(*self.ordering))
+                self._by_id = {row.id: row for row in rows}
+                self._active = tuple(row for row in rows if row.is_active)
+                self._built_version = version
+
+    def get(self, pk):
+        self._ensure_built()
+        try:
+            return self._by_id[int(pk)]
+        except (KeyError, TypeError, ValueError):
+            raise self.model.DoesNotExist(
+                '{} matching id {!r} does not exist.'.format(self.model.__name__, pk))
+
+    def active(self):
+        self._ensure_built()
+        return self._active
+
+
+delivery_options = ReferenceCache(DeliveryOptions, ('order', 'id'), 'delivery_options')
@@ -1,12 +1,111 @@
-import sys
+import copy
+import threading
+import time
 
-from paypalcheckoutsdk.core import PayPalHttpClient, SandboxEnvironment
+import requests
+from django.conf import settings
+from paypalcheckoutsdk.core import AccessToken, AccessTokenRequest, PayPalEnvironment, PayPalHttpClient
+
+
+ENVIRONMENTS = {
+    'sandbox': (PayPalEnvironment.SANDBOX_API_URL, PayPalEnvironment.SANDBOX_WEB_URL),
+    'live': (PayPalEnvironment.LIVE_API_URL, PayPalEnvironment.LIVE_WEB_URL),
+}
+
+# Fetch a new access token this many seconds before the current one expires
+TOKEN_REFRESH_MARGIN = 300
+
+
+class PooledPayPalHttpClient(PayPalHttpClient):
+    # PayPalHttpClient that sends every call through one keep-alive session
+    # with a timeout, and shares a single access token between threads,
+    # renewing it shortly before it expires instead of after a failed call.
+    def __init__(self, environment, timeout):
+        super().__init__(environment)
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._token_lock = threading.Lock()
+
+    def get_timeout(self):
+        return self.timeout
+
+    def _token_is_fresh(self, token):
+        return token is not None and token.created_at + token.expires_in - TOKEN_REFRESH_MARGIN > time.time()
+
+    def access_token(self):
+        token = self._access_token
+        if not self._token_is_fresh(token):
+            with self._token_lock:
+                token = self._access_token
+                if not self._token_is_fresh(token):
+                    result = self.execute(AccessTokenRequest(self.environment)).result
+                    token = AccessToken(access_token=result.access_token,
+                                        expires_in=result.expires_in,
+                                        token_type=result.token_type)
+                    self._access_token = token
+        return token
+
+    def __call__(self, request):
+        # Injector run on every request: set our cached token before the SDK
+        # would fetch one of its own
+        if 'Authorization' not in request.headers and not isinstance(request, AccessTokenRequest):
+            request.headers['Authorization'] = self.access_token().authorization_string()
+        super().__call__(request)
+
+    def execute(self, request):
+        # HttpClient.execute sends with requests.request: a new connection and
+        # no timeout per call. Same steps here, built on the SDK's injectors,
+        # encoder and parse_response, but sent through self.session.
+        request = copy.deepcopy(request)
+        request.headers = getattr(request, 'headers', None) or {}
+        for injector in self._injectors:
+            injector(request)
+        if 'user-agent' not in self.format_headers(request.headers):
+            request.headers['user-agent'] = self.get_user_agent()
+
+        data = None
+        if getattr(request, 'body', None) is not None:
+            # The encoder looks headers up in lower case and may set some
+            serializable = copy.copy(request)
+            serializable.headers = self.format_headers(request.headers)
+            data = self.encoder.serialize_request(serializable)
+            request.headers = self.map_headers(request.headers, serializable.headers)
+
+        response = self.session.request(
+            method=request.verb, url=self.environment.base_url + request.path,
+            headers=request.headers, data=data, timeout=self.get_timeout())
+        return self.parse_response(response)
 
 
 class PayPalClient:
+    # Process-wide client built from settings on first use, so the token and
+    # the open connections carry over from one payment to the next.
     def __init__(self):
-        self.client_id = 'Af6Nxex4XS0OisTJH2XfObnqbIZ77tNvEwj7zOaY_beb24kGTj-7fUs97Kc_AL4y749VQYtpOzE3xqL9'
-        self.client_secret = 'EGFPq5SvhBBflwIBza5G1d1NEAebjPUXJCXUN3tcOX5SBaATM7EWSxduHGrJFgmbpZyNy_hxYFlFU9Tk'
-        self.environment = SandboxEnvironment(
-            client_id=self.client_id, client_secret=self.client_secret)
-        self.client = PayPalHttpClient(self.environment)
+        self._client = None
+        self._lock = threading.Lock()
+
+    def reset(self):
+        self._client = None
+
+    def _build(self):
+        api_url, web_url = ENVIRONMENTS[settings.PAYPAL_ENVIRONMENT]
+        environment = PayPalEnvironment(
+            client_id=settings.PAYPAL_CLIENT_ID, client_secret=settings.PAYPAL_CLIENT_SECRET,
+            apiUrl=settings.PAYPAL_API_URL or api_url, webUrl=web_url)
+        return PooledPayPalHttpClient(environment, settings.PAYPAL_TIMEOUT)
+
+    @property
+    def client(self):
+        client = self._client
+        if client is None:
+            with self._lock:
+                client = self._client
+                if client is None:
+                    client = self._client = self._build()
+        return client
+
+    def execute(self, request):
+        return self.client.execute(request)
+
+
+paypal_client = PayPalClient()
@@ -0,0 +1,19 @@
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import DeliveryOptions
+from .options import delivery_options
+from .paypal import paypal_client
+
+
+@receiver(post_save, sender=DeliveryOptions)
+@receiver(post_delete, sender=DeliveryOptions)
+def refresh_delivery_options(sender, instance, **kwargs):
+    delivery_options.invalidate()
+
+
+@receiver(setting_changed)
+def refresh_paypal_client(setting, **kwargs):
+    if setting.startswith('PAYPAL_'):
+        paypal_client.reset()
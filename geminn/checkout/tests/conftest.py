@@ -0,0 +1,98 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+TOKEN = {'access_token': 'stub-token', 'token_type': 'Bearer', 'expires_in': 32400}
+
+
+class PayPalStub:
+    # Scripted stand-in for the PayPal REST API. Each (verb, path) answers
+    # with its queued responses in turn, repeating the last one; every call
+    # is recorded.
+    def __init__(self):
+        self.routes = {('POST', '/v1/oauth2/token'): [(200, TOKEN)]}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def respond(self, verb, path, *responses):
+        self.routes[(verb, path)] = list(responses)
+
+    def count(self, verb, path):
+        return self.calls.count((verb, path))
+
+    def answer(self, verb, path):
+        with self._lock:
+            self.calls.append((verb, path))
+            responses = self.routes.get((verb, path))
+            if not responses:
+                return 404, {'name': 'RESOURCE_NOT_FOUND'}
+            return responses.pop(0) if len(responses) > 1 else responses[0]
+
+
+def build_paypal_order(order_id, status='APPROVED', value='12.50', currency='USD', capture_status=None,
+                       shipping=True):
+    # An order as PayPal returns it; capture_status adds its capture and
+    # shipping=False leaves out the payer and shipping details
+    order = {
+        'id': order_id,
+        'status': status,
+        'payer': {'email_address': 'buyer@example.com'},
+        'purchase_units': [{
+            'amount': {'value': value, 'currency_code': currency},
+            'shipping': {
+                'name': {'full_name': 'Buyer One'},
+                'address': {'address_line_1': '1 Main St', 'admin_area_2': 'Town',
+                            'postal_code': '12345', 'country_code': 'US'},
+            },
+        }],
+    }
+    if not shipping:
+        del order['purchase_units'][0]['shipping']
+        del order['payer']
+    if capture_status is not None:
+        order['purchase_units'][0]['payments'] = {'captures': [{
+            'id': 'capture-' + order_id, 'status': capture_status,
+            'amount': {'value': value, 'currency_code': currency},
+        }]}
+    return order
+
+
+@pytest.fixture
+def paypal_order():
+    return build_paypal_order
+
+
+@pytest.fixture
+def paypal_stub(settings):
+    stub = PayPalStub()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _answer(self):
+            self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            status, body = stub.answer(self.command, self.path.split('?')[0])
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST = _answer
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True).start()
+
+    # Changing PAYPAL_* settings resets the shared client onto the stub
+    settings.PAYPAL_API_URL = 'http://127.0.0.1:{}'.format(server.server_port)
+    settings.PAYPAL_CLIENT_ID = 'stub-client'
+    settings.PAYPAL_CLIENT_SECRET = 'stub-secret'
+    yield stub
+
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.test import override_settings
+from paypalcheckoutsdk.orders import OrdersGetRequest
+from paypalhttp import http_client
+
+from checkout import paypal
+from checkout.paypal import paypal_client
+
+
+ORDER_KEY = 'PAYPAL-ORDER-1'
+ORDER_PATH = '/v2/checkout/orders/' + ORDER_KEY
+TOKEN_PATH = '/v1/oauth2/token'
+
+
+def get_order():
+    return paypal_client.execute(OrdersGetRequest(ORDER_KEY)).result
+
+
+def token(expires_in):
+    return (200, {'access_token': 'token-{}'.format(expires_in), 'token_type': 'Bearer',
+                  'expires_in': expires_in})
+
+
+def test_token_is_fetched_once_across_calls(paypal_stub, paypal_order):
+    paypal_stub.respond('GET', ORDER_PATH, (200, paypal_order(ORDER_KEY)))
+
+    for _ in range(3):
+        assert get_order().id == ORDER_KEY
+
+    assert paypal_stub.count('POST', TOKEN_PATH) == 1
+    assert paypal_stub.count('GET', ORDER_PATH) == 3
+
+
+def test_token_is_fetched_once_across_threads(paypal_stub, paypal_order):
+    paypal_stub.respond('GET', ORDER_PATH, (200, paypal_order(ORDER_KEY)))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: get_order().id, range(16)))
+
+    assert results == [ORDER_KEY] * 16
+    assert paypal_stub.count('POST', TOKEN_PATH) == 1
+
+
+def test_token_is_refreshed_within_the_margin(paypal_stub, paypal_order):
+    paypal_stub.respond('GET', ORDER_PATH, (200, paypal_order(ORDER_KEY)))
+    paypal_stub.respond('POST', TOKEN_PATH, token(paypal.TOKEN_REFRESH_MARGIN - 1),
+                        token(paypal.TOKEN_REFRESH_MARGIN + 3600))
+
+    get_order()
+    get_order()
+    get_order()
+
+    # The first token was already inside the margin, the second was not
+    assert paypal_stub.count('POST', TOKEN_PATH) == 2
+    assert paypal_client.client.access_token().access_token == 'token-{}'.format(
+        paypal.TOKEN_REFRESH_MARGIN + 3600)
+
+
+def test_calls_share_the_session_and_timeout(paypal_stub, paypal_order, monkeypatch):
+    paypal_stub.respond('GET', ORDER_PATH, (200, paypal_order(ORDER_KEY)))
+    client = paypal_client.client
+    timeouts = []
+    send = client.session.request
+
+    def request(*args, **kwargs):
+        timeouts.append(kwargs['timeout'])
+        return send(*args, **kwargs)
+
+    monkeypatch.setattr(client.session, 'request', request)
+    get_order()
+
+    # The token fetch and the call itself
+    assert timeouts == [client.get_timeout()] * 2
+    # Without touching the SDK's own transport
+    assert http_client.requests is requests
+
+
+def test_settings_change_resets_the_client(paypal_stub, paypal_order):
+    paypal_stub.respond('GET', ORDER_PATH, (200, paypal_order(ORDER_KEY)))
+    get_order()
+    client = paypal_client.client
+
+    with override_settings(PAYPAL_TIMEOUT=3):
+        assert paypal_client.client is not client
+        assert paypal_client.client.get_timeout() == 3
+        get_order()
+
+    assert paypal_client.client is not client
+    # Every new client fetched its own token
+    assert paypal_stub.count('POST', TOKEN_PATH) == 2
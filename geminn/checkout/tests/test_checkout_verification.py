@@ -0,0 +1,185 @@
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from paypalhttp import HttpError
+
+from checkout import verification
+from orders.models import Order
+
+
+ORDER_KEY = 'PAYPAL-ORDER-1'
+ORDER_PATH = '/v2/checkout/orders/' + ORDER_KEY
+CAPTURE_PATH = ORDER_PATH + '/capture'
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr(verification, 'RETRY_DELAY', 0)
+
+
+@pytest.fixture
+def order(django_user_model):
+    user = django_user_model.objects.create_user(
+        username='buyer', email='buyer@example.com', password='password1234')
+    return Order.objects.create(
+        user=user, order_key=ORDER_KEY, payment_option='paypal',
+        total_paid=Decimal('12.50'), currency='USD')
+
+
+def payment_status():
+    return Order.objects.values_list('payment_status', flat=True).get(order_key=ORDER_KEY)
+
+
+@pytest.mark.django_db
+def test_approved_order_is_captured_and_paid(paypal_stub, paypal_order, order):
+    paypal_stub.respond('GET', ORDER_PATH, (200, paypal_order(ORDER_KEY)))
+    paypal_stub.respond('POST', CAPTURE_PATH, (201, paypal_order(
+        ORDER_KEY, status='COMPLETED', capture_status='COMPLETED')))
+
+    assert verification.verify(ORDER_KEY)
+
+    order.refresh_from_db()
+    assert order.payment_status == Order.PAID
+    assert order.billing_status
+    assert order.total_paid == Decimal('12.50')
+    assert order.full_name == 'Buyer One'
+    assert paypal_stub.count('POST', CAPTURE_PATH) == 1
+
+
+@pytest.mark.django_db
+def test_capture_without_customer_details_is_paid(paypal_stub, paypal_order, order):
+    paypal_stub.respond('GET', ORDER_PATH, (200, paypal_order(ORDER_KEY, shipping=False)))
+    paypal_stub.respond('POST', CAPTURE_PATH, (201, paypal_order(
+        ORDER_KEY, status='COMPLETED', capture_status='COMPLETED', shipping=False)))
+
+    assert verification.verify(ORDER_KEY)
+
+    order.refresh_from_db()
+    assert order.payment_status == Order.PAID
+    assert order.full_name == ''
+    assert order.email == ''
+
+
+@pytest.mark.django_db
+def test_order_captured_already_is_paid_without_capturing_again(paypal_stub, paypal_order, order):
+    paypal_stub.respond('GET', ORDER_PATH, (200, paypal_order(
+        ORDER_KEY, status='COMPLETED', capture_status='COMPLETED')))
+
+    assert verification.verify(ORDER_KEY)
+
+    assert payment_status() == Order.PAID
+    assert paypal_stub.count('POST', CAPTURE_PATH) == 0
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('status', ['CREATED', 'SAVED', 'VOIDED', 'PAYER_ACTION_REQUIRED'])
+def test_unpaid_order_fails(paypal_stub, paypal_order, order, status):
+    paypal_stub.respond('GET', ORDER_PATH, (200, paypal_order(ORDER_KEY, status=status)))
+
+    assert verification.verify(ORDER_KEY)
+
+    assert payment_status() == Order.FAILED
+    assert paypal_stub.count('POST', CAPTURE_PATH) == 0
+
+
+@pytest.mark.django_db
+def test_declined_capture_fails(paypal_stub, paypal_order, order):
+    paypal_stub.respond('GET', ORDER_PATH, (200, paypal_order(ORDER_KEY)))
+    paypal_stub.respond('POST', CAPTURE_PATH, (201, paypal_order(
+        ORDER_KEY, status='COMPLETED', capture_status='DECLINED')))
+
+    assert verification.verify(ORDER_KEY)
+
+    assert payment_status() == Order.FAILED
+
+
+@pytest.mark.django_db
+def test_pending_capture_leaves_order_pending(paypal_stub, paypal_order, order):
+    paypal_stub.respond('GET', ORDER_PATH, (200, paypal_order(ORDER_KEY)))
+    paypal_stub.respond('POST', CAPTURE_PATH, (201, paypal_order(
+        ORDER_KEY, status='COMPLETED', capture_status='PENDING')))
+
+    assert not verification.verify(ORDER_KEY)
+
+    assert payment_status() == Order.PENDING
+
+
+@pytest.mark.django_db
+def test_server_errors_are_retried(paypal_stub, paypal_order, order):
+    paypal_stub.respond('GET', ORDER_PATH, (503, {'name': 'SERVICE_UNAVAILABLE'}),
+                        (500, {'name': 'INTERNAL_SERVER_ERROR'}), (200, paypal_order(ORDER_KEY)))
+    paypal_stub.respond('POST', CAPTURE_PATH, (201, paypal_order(
+        ORDER_KEY, status='COMPLETED', capture_status='COMPLETED')))
+
+    assert verification.verify(ORDER_KEY, attempts=3)
+
+    assert payment_status() == Order.PAID
+    assert paypal_stub.count('GET', ORDER_PATH) == 3
+
+
+@pytest.mark.django_db
+def test_persistent_server_errors_leave_order_pending(paypal_stub, order):
+    paypal_stub.respond('GET', ORDER_PATH, (503, {'name': 'SERVICE_UNAVAILABLE'}))
+
+    with pytest.raises(HttpError):
+        verification.verify(ORDER_KEY, attempts=2)
+
+    assert payment_status() == Order.PENDING
+    assert paypal_stub.count('GET', ORDER_PATH) == 2
+
+
+@pytest.mark.django_db
+def test_client_error_fails_without_retrying(paypal_stub, order):
+    paypal_stub.respond('GET', ORDER_PATH, (404, {'name': 'RESOURCE_NOT_FOUND'}))
+
+    assert verification.verify(ORDER_KEY, attempts=3)
+
+    assert payment_status() == Order.FAILED
+    assert paypal_stub.count('GET', ORDER_PATH) == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('value, currency', [('1.00', 'USD'), ('12.50', 'EUR')])
+def test_amount_mismatch_fails_before_capturing(paypal_stub, paypal_order, order, value, currency):
+    paypal_stub.respond('GET', ORDER_PATH, (200, paypal_order(ORDER_KEY, value=value, currency=currency)))
+
+    assert verification.verify(ORDER_KEY)
+
+    order.refresh_from_db()
+    assert order.payment_status == Order.FAILED
+    assert order.total_paid == Decimal('12.50')
+    assert paypal_stub.count('POST', CAPTURE_PATH) == 0
+
+
+@pytest.mark.django_db
+def test_captured_amount_mismatch_fails(paypal_stub, paypal_order, order):
+    paypal_stub.respond('GET', ORDER_PATH, (200, paypal_order(ORDER_KEY)))
+    paypal_stub.respond('POST', CAPTURE_PATH, (201, paypal_order(
+        ORDER_KEY, status='COMPLETED', value='2.00', capture_status='COMPLETED')))
+
+    assert verification.verify(ORDER_KEY)
+
+    assert payment_status() == Order.FAILED
+
+
+@pytest.mark.django_db
+def test_sweep_moves_past_an_order_that_cannot_be_verified(paypal_stub, paypal_order, order, monkeypatch):
+    broken = Order.objects.create(
+        user=order.user, order_key='PAYPAL-ORDER-0', payment_option='paypal',
+        total_paid=Decimal('12.50'), currency='USD')
+    paypal_stub.respond('GET', ORDER_PATH, (200, paypal_order(
+        ORDER_KEY, status='COMPLETED', capture_status='COMPLETED')))
+    verify = verification.verify
+
+    def verify_or_break(order_key):
+        if order_key == broken.order_key:
+            raise RuntimeError('broken order')
+        return verify(order_key)
+
+    monkeypatch.setattr(verification, 'verify', verify_or_break)
+    call_command('verify_pending_payments', older_than=0, stdout=StringIO(), stderr=StringIO())
+
+    assert payment_status() == Order.PAID
+    assert Order.objects.get(pk=broken.pk).payment_status == Order.PENDING
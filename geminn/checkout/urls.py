@@ -11,6 +11,7 @@ urlpatterns = [
     path("delivery_address/", views.delivery_address, name="delivery_address"),
     path("payment_selection/", views.payment_selection, name="payment_selection"),
     path("payment_complete/", views.payment_complete, name="payment_complete"),
+    path("payment_status/<str:order_key>/", views.payment_status, name="payment_status"),
     path("payment_successful/", views.payment_successful,
          name="payment_successful"),
 ]
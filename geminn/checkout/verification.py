@@ -0,0 +1,157 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import connection
+from paypalcheckoutsdk.orders import OrdersCaptureRequest, OrdersGetRequest
+from paypalhttp import HttpError
+
+from orders.models import Order
+from orders.services import settle_payment
+
+from .paypal import paypal_client
+
+
+logger = logging.getLogger(__name__)
+
+# PayPal status of an approved order still to be captured, and of a
+# captured order or a capture whose funds reached us
+APPROVED = 'APPROVED'
+COMPLETED = 'COMPLETED'
+# Capture status while PayPal holds the funds (e.g. under review)
+PENDING = 'PENDING'
+RETRY_DELAY = 1
+
+
+def _execute(request, attempts):
+    # The response, or None when PayPal rejects the call (4xx). Provider and
+    # network failures are retried with backoff, then raised.
+    for attempt in range(attempts):
+        try:
+            return paypal_client.execute(request)
+        except HttpError as error:
+            if error.status_code < 500:
+                return None
+            if attempt + 1 == attempts:
+                raise
+        except IOError:
+            if attempt + 1 == attempts:
+                raise
+        time.sleep(RETRY_DELAY * 2 ** attempt)
+
+
+def _matches(amount, order):
+    # Whether a PayPal amount is exactly what the order was placed for
+    try:
+        value = Decimal(amount.value)
+    except (AttributeError, InvalidOperation, TypeError):
+        return False
+    return value == order['total_paid'] and amount.currency_code == order['currency']
+
+
+def _detail(obj, *names):
+    # Optional customer detail at obj.<names...>, '' when PayPal left it out
+    for name in names:
+        obj = getattr(obj, name, None)
+    return obj or ''
+
+
+def _capture_of(result):
+    try:
+        return result.purchase_units[0].payments.captures[0]
+    except (AttributeError, IndexError):
+        return None
+
+
+def verify(order_key, attempts=None):
+    # Check the order at PayPal, capture it once the buyer approved it, and
+    # settle ours from the capture: paid only when PayPal completed a capture
+    # of exactly the order's total. A 4xx from PayPal fails the order; if
+    # provider or network failures persist, or the capture is still pending,
+    # the order is left pending for verify_pending_payments to retry later.
+    attempts = attempts or settings.PAYMENT_VERIFICATION_ATTEMPTS
+    order = Order.objects.filter(order_key=order_key, payment_status=Order.PENDING).values(
+        'total_paid', 'currency').first()
+    if order is None:
+        return False
+
+    response = _execute(OrdersGetRequest(order_key), attempts)
+    if response is None:
+        # PayPal does not know this order or refuses to show it
+        return settle_payment(order_key, paid=False)
+
+    result = response.result
+    if result.status == APPROVED:
+        # Check the amount before taking the money, not after
+        if not _matches(result.purchase_units[0].amount, order):
+            logger.warning('PayPal order %s does not match the order total', order_key)
+            return settle_payment(order_key, paid=False)
+
+        capture = OrdersCaptureRequest(order_key)
+        capture.prefer('return=representation')
+        # Repeated captures of the same order return the first one's result
+        capture.pay_pal_request_id('capture-{}'.format(order_key))
+        response = _execute(capture, attempts)
+        if response is None:
+            return settle_payment(order_key, paid=False)
+        result = response.result
+
+    captured = _capture_of(result)
+    if result.status != COMPLETED or captured is None:
+        return settle_payment(order_key, paid=False)
+    if captured.status == PENDING:
+        return False
+    if captured.status != COMPLETED:
+        return settle_payment(order_key, paid=False)
+    if not _matches(captured.amount, order):
+        logger.error('PayPal captured a different amount for order %s; refund it by hand', order_key)
+        return settle_payment(order_key, paid=False)
+
+    # The money is taken: settle paid whatever customer details came with it
+    shipping = getattr(result.purchase_units[0], 'shipping', None)
+    return settle_payment(
+        order_key,
+        paid=True,
+        full_name=_detail(shipping, 'name', 'full_name'),
+        email=_detail(result, 'payer', 'email_address'),
+        address1=_detail(shipping, 'address', 'address_line_1'),
+        address2=_detail(shipping, 'address', 'admin_area_2'),
+        postal_code=_detail(shipping, 'address', 'postal_code'),
+        country_code=_detail(shipping, 'address', 'country_code'),
+    )
+
+
+class PaymentVerifier:
+    # Process-wide thread pool that runs verify() off the request path, so a
+    # slow provider holds these threads instead of the web workers.
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=settings.PAYMENT_VERIFICATION_WORKERS,
+                        thread_name_prefix='payment-verification')
+        return self._executor
+
+    def submit(self, order_key):
+        return self._get_executor().submit(self._run, order_key)
+
+    def _run(self, order_key):
+        try:
+            return verify(order_key)
+        except Exception:
+            logger.exception('Could not verify PayPal order %s', order_key)
+            return False
+        finally:
+            # Worker threads own their connections; don't leave them open
+            connection.close()
+
+
+verifier = PaymentVerifier()
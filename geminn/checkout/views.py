@@ -1,21 +1,26 @@
-from paypalcheckoutsdk.orders import OrdersGetRequest
 import json
+import uuid
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseRedirect, JsonResponse
+from django.http import Http404, HttpResponseRedirect, JsonResponse
 from django.shortcuts import render
+from django.urls import reverse
+from django.views.decorators.cache import never_cache
 from accounts.models import Address
 from bag.bag import Bag
-from orders.models import Order, OrderItem
+from inventory import reservations
+from orders.models import Order
+from orders.services import create_order
 
-from .models import DeliveryOptions
-from .paypal import PayPalClient
+from .options import delivery_options
+from .verification import verifier
 
 
 @login_required
 def deliverychoices(request):
-    deliveryoptions = DeliveryOptions.objects.filter(is_active=True)
+    deliveryoptions = delivery_options.active()
     return render(request, "checkout/delivery_choices.html", {"deliveryoptions": deliveryoptions})
 
 
@@ -24,7 +29,7 @@ def bag_update_delivery(request):
     bag = Bag(request)
     if request.POST.get("action") == "post":
         delivery_option = int(request.POST.get("deliveryoption"))
-        delivery_type = DeliveryOptions.objects.get(id=delivery_option)
+        delivery_type = delivery_options.get(delivery_option)
         updated_total_price = bag.bag_update_delivery(
             delivery_type.delivery_price)
 
@@ -38,7 +43,7 @@ def bag_update_delivery(request):
             session.modified = True
 
         response = JsonResponse(
-            {"total": updated_total_price, "delivery_price": delivery_type.delivery_price})
+            {"total": str(updated_total_price), "delivery_price": delivery_type.delivery_price})
         return response
 
 
@@ -70,45 +75,67 @@ def payment_selection(request):
         messages.success(request, "Please select address option")
         return HttpResponseRedirect(request.META["HTTP_REFERER"])
 
-    return render(request, "checkout/payment_selection.html", {})
+    # Totals shown and sent to PayPal use today's prices
+    bag = Bag(request)
+    price_changes = bag.revalidate()
+
+    # Hold the units until payment; retrying the step extends the hold
+    if "reservation_key" not in session:
+        session["reservation_key"] = uuid.uuid4().hex
+    out_of_stock = []
+    try:
+        reservations.reserve(session["reservation_key"], {
+            item.product.id: item.qty for item in bag})
+    except reservations.InsufficientStock as error:
+        out_of_stock = [item.product.title for item in bag
+                        if item.product.id in error.product_ids]
+
+    return render(request, "checkout/payment_selection.html", {
+        "price_changes": price_changes,
+        "out_of_stock": out_of_stock,
+        "paypal_client_id": settings.PAYPAL_CLIENT_ID,
+    })
 
 
 # PayPal
 
 @login_required
 def payment_complete(request):
-    PPClient = PayPalClient()
-
     body = json.loads(request.body)
-    data = body["orderID"]
-    user_id = request.user.id
-
-    requestorder = OrdersGetRequest(data)
-    response = PPClient.client.execute(requestorder)
-
-    total_paid = response.result.purchase_units[0].amount.value
-
-    bag = bag(request)
-    order = Order.objects.create(
-        user_id=user_id,
-        full_name=response.result.purchase_units[0].shipping.name.full_name,
-        email=response.result.payer.email_address,
-        address1=response.result.purchase_units[0].shipping.address.address_line_1,
-        address2=response.result.purchase_units[0].shipping.address.admin_area_2,
-        postal_code=response.result.purchase_units[0].shipping.address.postal_code,
-        country_code=response.result.purchase_units[0].shipping.address.country_code,
-        total_paid=response.result.purchase_units[0].amount.value,
-        order_key=response.result.id,
+    order_key = body.get("orderID")
+    if not order_key:
+        return JsonResponse({"error": "Missing orderID"}, status=400)
+
+    # Record the order as pending and verify it with PayPal in the background;
+    # the page polls payment_status until the verifier settles it
+    bag = Bag(request)
+    total = bag.get_total_price()
+    order, created = create_order(
+        bag,
+        reservation_key=request.session.pop("reservation_key", None),
+        user_id=request.user.id,
+        total_paid=total.amount,
+        currency=total.currency,
+        order_key=order_key,
         payment_option="paypal",
-        billing_status=True,
     )
-    order_id = order.pk
+    if created:
+        verifier.submit(order.order_key)
+
+    return JsonResponse({
+        "status": order.payment_status,
+        "status_url": reverse("checkout:payment_status", args=[order.order_key]),
+    }, status=202)
 
-    for item in bag:
-        OrderItem.objects.create(
-            order_id=order_id, product=item["product"], price=item["price"], quantity=item["qty"])
 
-    return JsonResponse("Payment completed!", safe=False)
+@never_cache
+@login_required
+def payment_status(request, order_key):
+    payment = Order.objects.filter(
+        order_key=order_key, user=request.user).values("payment_status", "units_short").first()
+    if payment is None:
+        raise Http404
+    return JsonResponse({"status": payment["payment_status"], "units_short": payment["units_short"]})
 
 
 @login_required
@@ -0,0 +1,53 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from bag.bag import Bag
+
+
+def _viewer_state(request):
+    # Everything per-visitor that the shared layout renders
+    return {
+        'user': request.user.pk,
+        'bag': Bag(request).get_totals(),
+        'csrf': request.COOKIES.get(settings.CSRF_COOKIE_NAME),
+    }
+
+
+def _validators(request, state_func, args, kwargs):
+    # Memoized on the request: condition() asks for the ETag and
+    # Last-Modified separately
+    if not hasattr(request, '_conditional_validators'):
+        if len(get_messages(request)):
+            # Flash messages render once and must not be answered with a 304
+            request._conditional_validators = (None, None)
+        else:
+            version, updated_at, fingerprint = state_func(request, *args, **kwargs)
+            viewer = _viewer_state(request)
+            payload = json.dumps([request.get_full_path(), version, updated_at, fingerprint, viewer],
+                                 sort_keys=True, default=str)
+            etag = hashlib.md5(payload.encode()).hexdigest()
+            anonymous = viewer['user'] is None and not viewer['bag']['qty']
+            request._conditional_validators = (
+                etag, updated_at if anonymous else None)
+    return request._conditional_validators
+
+
+def conditional_page(state_func):
+    # state_func(request, *args, **kwargs) -> (version, updated_at, fingerprint).
+    # Last-Modified cannot tell visitors apart, so it is only sent to
+    # anonymous visitors with an empty bag; everyone else gets an ETag.
+    def etag(request, *args, **kwargs):
+        return _validators(request, state_func, args, kwargs)[0]
+
+    def last_modified(request, *args, **kwargs):
+        return _validators(request, state_func, args, kwargs)[1]
+
+    def decorator(view_func):
+        return cache_control(private=True, no_cache=True)(
+            condition(etag_func=etag, last_modified_func=last_modified)(view_func))
+    return decorator
@@ -0,0 +1,81 @@
+from decimal import ROUND_HALF_UP, Decimal
+from functools import total_ordering
+
+from django.conf import settings
+
+
+CENT = Decimal('0.01')
+
+
+@total_ordering
+class Money:
+    # Amount in integer minor units (cents) plus an ISO currency code, so
+    # totals are plain integer sums and nothing is re-parsed per line.
+    __slots__ = ('cents', 'currency')
+
+    def __init__(self, cents=0, currency=None):
+        self.cents = int(cents)
+        self.currency = currency or settings.DEFAULT_CURRENCY
+
+    @classmethod
+    def from_decimal(cls, amount, currency=None):
+        cents = (Decimal(str(amount or 0)) / CENT).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+        return cls(cents, currency)
+
+    @property
+    def amount(self):
+        return Decimal(self.cents).scaleb(-2)
+
+    def _check(self, other):
+        if other.currency != self.currency:
+            raise ValueError('Cannot combine {} and {}'.format(self.currency, other.currency))
+
+    def __add__(self, other):
+        # Plain 0 is sum()'s start value; Money operands always have their
+        # currency checked, zero or not
+        if isinstance(other, int) and other == 0:
+            return self
+        if not isinstance(other, Money):
+            return NotImplemented
+        self._check(other)
+        return Money(self.cents + other.cents, self.currency)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if not isinstance(other, Money):
+            return NotImplemented
+        self._check(other)
+        return Money(self.cents - other.cents, self.currency)
+
+    def __mul__(self, quantity):
+        if not isinstance(quantity, int):
+            return NotImplemented
+        return Money(self.cents * quantity, self.currency)
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other):
+        if isinstance(other, Money):
+            return (self.cents, self.currency) == (other.cents, other.currency)
+        if other == 0:
+            return self.cents == 0
+        return NotImplemented
+
+    def __lt__(self, other):
+        if not isinstance(other, Money):
+            return NotImplemented
+        self._check(other)
+        return self.cents < other.cents
+
+    def __hash__(self):
+        return hash((self.cents, self.currency))
+
+    def __bool__(self):
+        return self.cents != 0
+
+    def __str__(self):
+        return str(self.amount)
+
+    def __repr__(self):
+        return 'Money({} {})'.format(self.amount, self.currency)
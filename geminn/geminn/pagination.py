@@ -0,0 +1,130 @@
+import base64
+import json
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import QueryDict
+
+
+class CursorPage:
+    def __init__(self, object_list, has_next, has_previous, next_cursor, previous_cursor, params, cursor_param):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.params = params
+        self.cursor_param = cursor_param
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def _query(self, cursor):
+        params = self.params.copy()
+        params[self.cursor_param] = cursor
+        return params.urlencode()
+
+    @property
+    def next_query(self):
+        return self._query(self.next_cursor) if self.has_next else ''
+
+    @property
+    def previous_query(self):
+        return self._query(self.previous_cursor) if self.has_previous else ''
+
+
+class CursorPaginator:
+    # Keyset pagination: every page is a bounded index range scan, so deep
+    # pages cost the same as the first one (no OFFSET).
+    def __init__(self, queryset, ordering=('-updated_at', 'id'), per_page=24, cursor_param='cursor'):
+        self.queryset = queryset
+        self.set_ordering(ordering)
+        self.per_page = per_page
+        self.cursor_param = cursor_param
+
+    def set_ordering(self, ordering):
+        self.ordering = tuple(ordering)
+        self.fields = [(field.lstrip('-'), field.startswith('-'))
+                       for field in self.ordering]
+
+    def encode_cursor(self, direction, obj):
+        values = [self._value(obj, name) for name, descending in self.fields]
+        payload = json.dumps([direction, values], default=str)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, values = json.loads(base64.urlsafe_b64decode(padded))
+        except (TypeError, ValueError):
+            return None, None
+
+        if (direction not in ('n', 'p') or not isinstance(values, list)
+                or len(values) != len(self.fields)):
+            return None, None
+
+        return direction, values
+
+    def _value(self, obj, name):
+        for attr in name.split('__'):
+            obj = getattr(obj, attr)
+        return obj
+
+    def _seek(self, values, backwards):
+        clauses = []
+        for index, (name, descending) in enumerate(self.fields):
+            equal = [Q(**{field: value}) for (field, _), value
+                     in zip(self.fields[:index], values)]
+            lookup = 'lt' if descending != backwards else 'gt'
+            clauses.append(
+                reduce(and_, equal + [Q(**{name + '__' + lookup: values[index]})]))
+        return reduce(or_, clauses)
+
+    def _reversed(self):
+        return [name if descending else '-' + name for name, descending in self.fields]
+
+    def fetch(self, values, backwards, limit):
+        # Up to limit rows past values (None: from the start), in page order
+        # when going forwards and reversed when going backwards. Returns the
+        # rows and the values actually used.
+        queryset = self.queryset
+        if values is not None:
+            try:
+                queryset = queryset.filter(self._seek(values, backwards))
+            except (TypeError, ValueError, ValidationError):
+                # Cursor from another ordering or tampered with: start over
+                queryset, values, backwards = self.queryset, None, False
+        queryset = queryset.order_by(
+            *(self._reversed() if backwards else self.ordering))
+        return list(queryset[:limit]), values, backwards
+
+    def page(self, cursor=None, params=None):
+        direction, values = self.decode_cursor(cursor) if cursor else (None, None)
+        backwards = direction == 'p'
+
+        rows, values, backwards = self.fetch(values, backwards, self.per_page + 1)
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        next_cursor = self.encode_cursor('n', rows[-1]) if rows else None
+        previous_cursor = self.encode_cursor('p', rows[0]) if rows else None
+
+        if params is None:
+            params = QueryDict()
+
+        return CursorPage(rows, has_next and bool(rows), has_previous and bool(rows),
+                          next_cursor, previous_cursor, params, self.cursor_param)
+
+    def get_page(self, request):
+        return self.page(request.GET.get(self.cursor_param), request.GET)
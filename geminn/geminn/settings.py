@@ -30,6 +30,7 @@ INSTALLED_APPS = [
     'bag.apps.BagConfig',
     'checkout.apps.CheckoutConfig',
     'orders.apps.OrdersConfig',
+    'api.apps.ApiConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -64,8 +65,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'bag.context_processors.bag',
-                # 'inventory.context_processors.categories',
-                # 'inventory.context_processors.sub_categories'
+                'inventory.context_processors.categories',
             ],
         },
     },
@@ -151,6 +151,39 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 # Bag session ID
 BAG_SESSION_ID = 'bag'
+BAG_TOTALS_SESSION_ID = 'bag_totals'
+
+# Where signed-in users' bags live: 'session' or 'database' (bag.BagItem)
+BAG_STORE = 'session'
+
+# Currency of bag and order totals (prices are kept in cents)
+DEFAULT_CURRENCY = 'USD'
+
+# Seconds a checkout holds the product units in the bag
+STOCK_RESERVATION_TTL = 15 * 60
+
+# Seconds the units of an order awaiting payment verification stay held;
+# verify_pending_payments settles such orders well within it
+PENDING_ORDER_RESERVATION_TTL = 24 * 60 * 60
+
+# PayPal REST credentials; PAYPAL_ENVIRONMENT is 'sandbox' or 'live' and
+# PAYPAL_API_URL overrides its API host (e.g. a local stub server)
+PAYPAL_CLIENT_ID = os.getenv('PAYPAL_CLIENT_ID')
+PAYPAL_CLIENT_SECRET = os.getenv('PAYPAL_CLIENT_SECRET')
+PAYPAL_ENVIRONMENT = os.getenv('PAYPAL_ENVIRONMENT', 'sandbox')
+PAYPAL_API_URL = os.getenv('PAYPAL_API_URL')
+PAYPAL_TIMEOUT = 10
+
+# Background threads verifying PayPal payments, and tries per payment
+PAYMENT_VERIFICATION_WORKERS = 4
+PAYMENT_VERIFICATION_ATTEMPTS = 3
+
+# Seconds a process may serve in-memory indexes (suggestions, facets,
+# reference data) before checking whether another process changed them
+CACHE_VERSION_CHECK_INTERVAL = 5
+
+# Seconds between refreshes of the homepage featured pool
+FEATURED_POOL_TTL = 300
 
 # Custom user model
 AUTH_USER_MODEL = 'accounts.UserModel'
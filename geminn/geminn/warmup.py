@@ -0,0 +1,20 @@
+import logging
+
+from django.db import DatabaseError
+
+
+logger = logging.getLogger(__name__)
+
+
+def warm_caches():
+    # Build the in-process indexes before a freshly started worker takes
+    # traffic, so no visitor waits on a cold build. Called from the gunicorn
+    # post_worker_init hook (gunicorn.conf.py).
+    from inventory import facets, suggestions
+
+    try:
+        suggestions.get_index()
+        facets.index.ensure_built()
+    except DatabaseError:
+        # Unmigrated database: the indexes build on first use instead
+        logger.exception('Could not warm in-process caches')
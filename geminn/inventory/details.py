@@ -0,0 +1,41 @@
+from django.db.models import Count, Prefetch
+from django.shortcuts import get_object_or_404
+
+from .models import Product, ProductReview, ProductSpecification, ProductSpecificationValue, ProductUnitImage
+
+
+PRODUCT_IMAGE_LIMIT = 6
+
+
+def load_product_detail(product_slug):
+    # Resolve the product once, then load its children by product id with a
+    # fixed number of batched queries.
+    product = get_object_or_404(
+        Product.objects.annotate(unit_count=Count('productunit')),
+        slug=product_slug, is_active=True)
+
+    product_specifications = list(ProductSpecification.objects.filter(
+        product_id=product.id, is_active=True).order_by('-updated_at').prefetch_related(
+        Prefetch('product_specification', to_attr='active_values',
+                 queryset=ProductSpecificationValue.objects.filter(is_active=True).only(
+                     'id', 'value', 'product_specification_id'))))
+
+    for product_specification in product_specifications:
+        product_specification.distinct_values = sorted(
+            {value.value for value in product_specification.active_values if value.value})
+
+    product_unit_images = list(ProductUnitImage.objects.filter(
+        product_id=product.id, is_active=True).order_by(
+        '-is_product_unit_default', '-updated_at')[:PRODUCT_IMAGE_LIMIT])
+
+    product_reviews = ProductReview.objects.filter(
+        product_id=product.id, is_active=True).select_related('added_by').order_by('-updated_at')
+
+    return {
+        'product': product,
+        'product_unit_count': product.unit_count,
+        'product_specifications': product_specifications,
+        'product_unit_images': product_unit_images,
+        'product_unit_image_default_for_product': product_unit_images[0] if product_unit_images else None,
+        'product_reviews': product_reviews,
+    }
@@ -0,0 +1,202 @@
+import threading
+from collections import defaultdict
+from decimal import Decimal
+from functools import reduce
+from operator import and_, or_
+
+from django.db.models import Exists, OuterRef, Q
+
+from .models import Product, ProductSpecificationValue
+from .versions import SharedVersion
+
+
+PRICE_RANGES = [
+    (Decimal('0'), Decimal('100')),
+    (Decimal('100'), Decimal('500')),
+    (Decimal('500'), Decimal('1000')),
+    (Decimal('1000'), Decimal('5000')),
+    (Decimal('5000'), None),
+]
+
+
+PRICE_KEYS = ['price:{}-{}'.format(low, high or '') for low, high in PRICE_RANGES]
+
+
+def _price_key(price):
+    # None for prices outside every range (e.g. negative): no price facet
+    for key, (low, high) in zip(PRICE_KEYS, PRICE_RANGES):
+        if price >= low and (high is None or price < high):
+            return key
+    return None
+
+
+def _price_label(low, high):
+    return '{}+'.format(low) if high is None else '{} - {}'.format(low, high)
+
+
+def _group(key):
+    # 'brand:3' -> 'brand', 'spec:color:golden' -> 'spec:color'
+    return key.rsplit(':', 1)[0] if key.startswith('spec:') else key.split(':', 1)[0]
+
+
+class FacetState:
+    # One build of the index. Replaced as a whole, so a reader holding it
+    # never mixes parts of two builds.
+    __slots__ = ('postings', 'base_keys', 'spec_values', 'labels', 'group_labels')
+
+    def __init__(self, postings=None, base_keys=None, spec_values=None, labels=None, group_labels=None):
+        self.postings = postings or {}
+        self.base_keys = base_keys or {}
+        self.spec_values = spec_values or {}
+        self.labels = labels or {}
+        self.group_labels = group_labels or {}
+
+
+class FacetIndex:
+    # Inverted index of facet value -> frozenset of product ids, plus the
+    # facet values present under each category and sub-category. Counts are
+    # set intersections; the listing itself is filtered in SQL. Rebuilt from
+    # three queries when the shared facets version moves.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = SharedVersion('facets')
+        self._built_version = None
+        self.state = FacetState()
+
+    def invalidate(self):
+        self.version.bump()
+
+    def _build(self):
+        postings = defaultdict(set)
+        product_bases = {}
+        spec_values = defaultdict(set)
+        labels = {}
+        group_labels = {'brand': 'Brand', 'price': 'Price'}
+
+        for key, (low, high) in zip(PRICE_KEYS, PRICE_RANGES):
+            labels[key] = _price_label(low, high)
+
+        for product_id, category_id, sub_category_id, brand_id, brand_title, retail_price in Product.objects.filter(
+                is_active=True).values_list('id', 'category_id', 'sub_category_id', 'brand_id',
+                                            'brand__title', 'retail_price').iterator():
+            bases = ['category:{}'.format(category_id)]
+            if sub_category_id:
+                bases.append('sub_category:{}'.format(sub_category_id))
+            product_bases[product_id] = bases
+            for key in bases:
+                postings[key].add(product_id)
+
+            if brand_id:
+                key = 'brand:{}'.format(brand_id)
+                labels[key] = brand_title
+                postings[key].add(product_id)
+            if retail_price is not None:
+                key = _price_key(retail_price)
+                if key:
+                    postings[key].add(product_id)
+
+        for product_id, title, value in ProductSpecificationValue.objects.filter(
+                is_active=True, product_specification__is_active=True,
+                product__is_active=True).values_list('product_id', 'product_specification__title', 'value').iterator():
+            key_title, key_value = title.strip().lower(), value.strip().lower()
+            if not key_title or not key_value:
+                continue
+            key = 'spec:{}:{}'.format(key_title.replace(':', ' '), key_value.replace(':', ' '))
+            labels[key] = key_value
+            group_labels[_group(key)] = key_title
+            spec_values[key].add((title, value))
+            postings[key].add(product_id)
+
+        # Facet values worth counting under each base
+        base_keys = defaultdict(set)
+        for key, ids in postings.items():
+            if key in labels:
+                for product_id in ids:
+                    for base in product_bases.get(product_id, ()):
+                        base_keys[base].add(key)
+
+        self.state = FacetState(
+            postings={key: frozenset(ids) for key, ids in postings.items()},
+            base_keys={base: tuple(keys) for base, keys in base_keys.items()},
+            spec_values={key: tuple(values) for key, values in spec_values.items()},
+            labels=labels,
+            group_labels=group_labels)
+
+    def ensure_built(self):
+        version = self.version.get()
+        if self._built_version == version:
+            return
+        with self._lock:
+            if self._built_version != version:
+                self._build()
+                self._built_version = version
+
+    def _filter(self, state, key):
+        # SQL condition matching the products posted under key
+        kind, value = key.split(':', 1)
+        if kind == 'brand':
+            return Q(brand_id=int(value))
+        if kind == 'price':
+            low, high = PRICE_RANGES[PRICE_KEYS.index(key)]
+            return Q(retail_price__gte=low) & (Q(retail_price__lt=high) if high is not None else Q())
+        condition = reduce(or_, (Q(product_specification__title=title, value=spec_value)
+                                 for title, spec_value in state.spec_values[key]))
+        return Q(Exists(ProductSpecificationValue.objects.filter(
+            condition, product=OuterRef('pk'), is_active=True, product_specification__is_active=True)))
+
+    def navigate(self, base_key, selected_keys):
+        # Returns (Q filter for the selection or None when nothing is
+        # selected, facets)
+        self.ensure_built()
+        state = self.state
+        postings = state.postings
+
+        base = postings.get(base_key, frozenset())
+        selected = {key for key in selected_keys if key in state.labels}
+
+        # Values are OR-ed inside a group and groups are AND-ed
+        by_group = defaultdict(list)
+        for key in selected:
+            by_group[_group(key)].append(key)
+        group_ids = {group: frozenset().union(*(postings.get(key, ()) for key in keys))
+                     for group, keys in by_group.items()}
+
+        def restrict(ids, skip=None):
+            for group, group_id_set in group_ids.items():
+                if group != skip:
+                    ids = ids & group_id_set
+            return ids
+
+        # Each group's counts ignore that group's own selection (disjunctive
+        # faceting), so selected groups are counted against their own subset
+        matching = restrict(base)
+        scopes = {group: restrict(base, skip=group) for group in group_ids}
+
+        groups = defaultdict(list)
+        for key in state.base_keys.get(base_key, ()):
+            group = _group(key)
+            count = len(postings[key] & scopes.get(group, matching))
+            if count or key in selected:
+                groups[group].append({
+                    'key': key,
+                    'label': state.labels[key],
+                    'count': count,
+                    'selected': key in selected,
+                })
+
+        facets = []
+        for group in sorted(groups, key=lambda group: (group != 'brand', group != 'price', group)):
+            values = groups[group]
+            if group == 'price':
+                values.sort(key=lambda value: PRICE_KEYS.index(value['key']))
+            else:
+                values.sort(key=lambda value: value['label'])
+            facets.append({'name': state.group_labels.get(group, group), 'values': values})
+
+        if not selected:
+            return None, facets
+        return reduce(and_, (reduce(or_, (self._filter(state, key) for key in keys))
+                             for keys in by_group.values())), facets
+
+
+index = FacetIndex()
@@ -0,0 +1,47 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+
+from .models import ProductReview, ProductUnit
+
+
+class FeaturedPool:
+    # Process-local pool of candidate ids for the homepage. Refreshed every
+    # FEATURED_POOL_TTL seconds, or on the next read after an inventory change.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._product_unit_ids = []
+        self._product_review_ids = []
+        self._expires_at = 0
+
+    def invalidate(self):
+        self._expires_at = 0
+
+    def _refresh(self):
+        if time.monotonic() < self._expires_at:
+            return
+
+        with self._lock:
+            if time.monotonic() < self._expires_at:
+                return
+            self._product_unit_ids = list(ProductUnit.objects.filter(
+                is_active=True).values_list('id', flat=True))
+            self._product_review_ids = list(ProductReview.objects.filter(
+                is_active=True).values_list('id', flat=True))
+            self._expires_at = time.monotonic() + settings.FEATURED_POOL_TTL
+
+    def _sample(self, ids, count):
+        return random.sample(ids, min(count, len(ids)))
+
+    def product_unit_ids(self, count):
+        self._refresh()
+        return self._sample(self._product_unit_ids, count)
+
+    def product_review_ids(self, count):
+        self._refresh()
+        return self._sample(self._product_review_ids, count)
+
+
+pool = FeaturedPool()
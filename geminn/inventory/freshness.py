@@ -0,0 +1,19 @@
+from .models import (Brand, Category, Discount, Product, ProductReview, ProductSpecification,
+                     ProductSpecificationValue, ProductUnit, ProductUnitImage, SubCategory)
+from .versions import SharedVersion
+
+
+# Everything catalog pages render from. A save or delete of any of these
+# (signals) or a sale of units (orders.services) bumps the version.
+CATALOG_MODELS = (
+    Brand, Category, SubCategory, Discount, Product, ProductUnit, ProductUnitImage,
+    ProductSpecification, ProductSpecificationValue, ProductReview,
+)
+
+catalog_version = SharedVersion('catalog')
+
+
+def catalog_state():
+    # (version, time of the last change): one primary key lookup, read fresh
+    # on every call so a change in any process is seen by the next request
+    return catalog_version.stamp()
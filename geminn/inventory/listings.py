@@ -0,0 +1,21 @@
+from django.db.models import Prefetch
+
+from .models import Product, ProductUnit, ProductUnitImage
+
+
+def default_image_prefetch(lookup):
+    # Sliced prefetch: one default image per row, fetched in a single query
+    default_images = ProductUnitImage.objects.filter(
+        is_product_unit_default=True, is_active=True).order_by('-updated_at', '-id')
+
+    return Prefetch(lookup, queryset=default_images[:1], to_attr='default_images')
+
+
+def product_unit_listing(*args, **kwargs):
+    return ProductUnit.objects.filter(*args, **kwargs).select_related(
+        'product').prefetch_related(default_image_prefetch('product_unit_image'))
+
+
+def product_listing(*args, **kwargs):
+    return Product.objects.filter(*args, **kwargs).prefetch_related(
+        default_image_prefetch('product'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from inventory import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the product full-text search index'
+
+    def handle(self, *args, **options):
+        search.create_index()
+        search.update_index()
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from inventory import reservations
+
+
+class Command(BaseCommand):
+    help = 'Release product unit reservations whose hold has expired'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=reservations.RELEASE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        released = reservations.release_expired(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            'Released {} expired reservation(s)'.format(released)))
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-updated_at', 'id'], name='product_updated_at_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productunit',
+            index=models.Index(fields=['-updated_at', 'id'], name='product_unit_updated_at_id_idx'),
+        ),
+    ]
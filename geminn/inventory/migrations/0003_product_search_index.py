@@ -0,0 +1,80 @@
+from django.db import migrations
+
+
+# The DDL is frozen here as it was when the index was introduced, so the
+# migration keeps doing the same thing however inventory.search changes.
+SQLITE_CREATE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS inventory_product_search USING fts5("
+    "title, description, brand, category, specifications, "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+
+SQLITE_INSERT = """
+    INSERT INTO inventory_product_search (rowid, title, description, brand, category, specifications)
+    SELECT p.id, p.title, COALESCE(p.description, ''), COALESCE(b.title, ''),
+           c.title || ' ' || COALESCE(s.title, ''),
+           COALESCE((SELECT GROUP_CONCAT(v.value, ' ')
+                     FROM inventory_productspecificationvalue v
+                     WHERE v.product_id = p.id AND v.is_active), '')
+    FROM inventory_product p
+    INNER JOIN inventory_category c ON c.id = p.category_id
+    LEFT JOIN inventory_brand b ON b.id = p.brand_id
+    LEFT JOIN inventory_subcategory s ON s.id = p.sub_category_id
+    WHERE p.is_active
+"""
+
+POSTGRESQL_CREATE = [
+    "CREATE TABLE IF NOT EXISTS inventory_product_search ("
+    "product_id bigint PRIMARY KEY REFERENCES inventory_product (id) "
+    "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+    "document tsvector NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS inventory_product_search_document_idx "
+    "ON inventory_product_search USING GIN (document)",
+]
+
+POSTGRESQL_INSERT = """
+    INSERT INTO inventory_product_search (product_id, document)
+    SELECT p.id,
+           setweight(to_tsvector('simple', p.title), 'A') ||
+           setweight(to_tsvector('simple', COALESCE(b.title, '') || ' ' || c.title || ' ' || COALESCE(s.title, '')), 'B') ||
+           setweight(to_tsvector('simple', COALESCE((SELECT string_agg(v.value, ' ')
+                                                     FROM inventory_productspecificationvalue v
+                                                     WHERE v.product_id = p.id AND v.is_active), '')), 'C') ||
+           setweight(to_tsvector('simple', COALESCE(p.description, '')), 'D')
+    FROM inventory_product p
+    INNER JOIN inventory_category c ON c.id = p.category_id
+    LEFT JOIN inventory_brand b ON b.id = p.brand_id
+    LEFT JOIN inventory_subcategory s ON s.id = p.sub_category_id
+    WHERE p.is_active
+"""
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        statements = [SQLITE_CREATE, SQLITE_INSERT]
+    elif vendor == 'postgresql':
+        statements = POSTGRESQL_CREATE + [POSTGRESQL_INSERT]
+    else:
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute('DROP TABLE IF EXISTS inventory_product_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_listing_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:22
+
+from django.db import migrations, models
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Product = apps.get_model('inventory', 'Product')
+    ProductReview = apps.get_model('inventory', 'ProductReview')
+
+    aggregates = {}
+    for product_id, stars in ProductReview.objects.filter(
+            is_active=True, stars__in=['1', '2', '3', '4', '5']).values_list('product_id', 'stars').iterator():
+        histogram = aggregates.setdefault(product_id, [0, 0, 0, 0, 0])
+        histogram[int(stars) - 1] += 1
+
+    for product_id, histogram in aggregates.items():
+        rating_count = sum(histogram)
+        rating_sum = sum(count * stars for stars, count in enumerate(histogram, 1))
+        Product.objects.filter(pk=product_id).update(
+            rating_count=rating_count,
+            rating_sum=rating_sum,
+            rating_average=rating_sum / rating_count,
+            rating_1=histogram[0],
+            rating_2=histogram[1],
+            rating_3=histogram[2],
+            rating_4=histogram[3],
+            rating_5=histogram[4],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_product_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_average',
+            field=models.FloatField(default=0, editable=False, verbose_name='Average rating'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Number of ratings'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Sum of rating stars'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-rating_average', 'id'], name='product_rating_average_id_idx'),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
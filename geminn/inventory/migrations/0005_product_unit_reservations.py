@@ -0,0 +1,27 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_product_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productunit',
+            name='reservation_key',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=64, verbose_name='Reservation key'),
+        ),
+        migrations.AddField(
+            model_name='productunit',
+            name='reserved_until',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Reserved until'),
+        ),
+        migrations.AddIndex(
+            model_name='productunit',
+            index=models.Index(fields=['product', 'sold', 'reserved_until'], name='product_unit_available_idx'),
+        ),
+    ]
@@ -252,6 +252,17 @@ class Product(models.Model):
     )
     users_favorite = models.ManyToManyField(
         UserModel, related_name='user_favorite', null=True, blank=True)
+    rating_count = models.PositiveIntegerField(
+        verbose_name=_('Number of ratings'), default=0, editable=False)
+    rating_sum = models.PositiveIntegerField(
+        verbose_name=_('Sum of rating stars'), default=0, editable=False)
+    rating_average = models.FloatField(
+        verbose_name=_('Average rating'), default=0, editable=False)
+    rating_1 = models.PositiveIntegerField(default=0, editable=False)
+    rating_2 = models.PositiveIntegerField(default=0, editable=False)
+    rating_3 = models.PositiveIntegerField(default=0, editable=False)
+    rating_4 = models.PositiveIntegerField(default=0, editable=False)
+    rating_5 = models.PositiveIntegerField(default=0, editable=False)
     added_by = models.ForeignKey(UserModel, on_delete=models.CASCADE)
     is_active = models.BooleanField(
         verbose_name=_('Product visibility'),
@@ -265,12 +276,22 @@ class Product(models.Model):
 
     class Meta:
         ordering = ('-created_at',)
+        indexes = [
+            models.Index(fields=['-updated_at', 'id'],
+                         name='product_updated_at_id_idx'),
+            models.Index(fields=['-rating_average', 'id'],
+                         name='product_rating_average_id_idx'),
+        ]
         verbose_name = _('Product')
         verbose_name_plural = _('Products')
 
     def get_absolute_url(self):
         return reverse('inventory:view_product', args=[self.slug])
 
+    @property
+    def rating_histogram(self):
+        return [self.rating_1, self.rating_2, self.rating_3, self.rating_4, self.rating_5]
+
     def __str__(self):
         return self.title
 
@@ -352,6 +373,11 @@ class ProductUnit(models.Model):
         help_text=_('Change product availability'),
         default=False,
     )
+    reserved_until = models.DateTimeField(
+        verbose_name=_('Reserved until'), null=True, blank=True, editable=False)
+    reservation_key = models.CharField(
+        verbose_name=_('Reservation key'), max_length=64, blank=True, default='',
+        db_index=True, editable=False)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     is_product_default = models.BooleanField(
         verbose_name=_('Product default'),
@@ -371,6 +397,12 @@ class ProductUnit(models.Model):
 
     class Meta:
         ordering = ('-created_at',)
+        indexes = [
+            models.Index(fields=['-updated_at', 'id'],
+                         name='product_unit_updated_at_id_idx'),
+            models.Index(fields=['product', 'sold', 'reserved_until'],
+                         name='product_unit_available_idx'),
+        ]
         verbose_name = _('Product Unit')
         verbose_name_plural = _('Product Units')
 
@@ -533,3 +565,14 @@ class ProductReview(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class CacheVersion(models.Model):
+    # Shared version numbers for data that processes cache in memory (see
+    # inventory.versions); bumped on writes, compared on reads
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(_('Updated at'), auto_now=True)
+
+    def __str__(self):
+        return '{} v{}'.format(self.name, self.version)
@@ -0,0 +1,60 @@
+import hashlib
+import threading
+
+from .models import Category, SubCategory
+from .versions import SharedVersion
+
+
+class CategoryTree:
+    # Process-local snapshot of active categories with their active
+    # sub-categories. Built from two queries and rebuilt once a Category or
+    # SubCategory change in any process moves the shared version.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = SharedVersion('navigation')
+        self._built_version = None
+        self._snapshot = ((), '')
+
+    def invalidate(self):
+        self.version.bump()
+
+    def _build(self):
+        sub_categories = {}
+        for category_id, title, slug, description in SubCategory.objects.filter(
+                is_active=True).order_by('title').values_list('category_id', 'title', 'slug', 'description').iterator():
+            sub_categories.setdefault(category_id, []).append({
+                'title': title, 'slug': slug, 'description': description})
+
+        return tuple({
+            'id': category_id,
+            'title': title,
+            'slug': slug,
+            'description': description,
+            'sub_categories': tuple(sub_categories.get(category_id, ())),
+        } for category_id, title, slug, description in Category.objects.filter(
+            is_active=True).order_by('title').values_list('id', 'title', 'slug', 'description').iterator())
+
+    def _ensure_built(self):
+        # (categories, fingerprint) of the current build, published together
+        version = self.version.get()
+        if self._built_version != version:
+            with self._lock:
+                if self._built_version != version:
+                    categories = self._build()
+                    self._snapshot = (categories, hashlib.md5(repr(categories).encode()).hexdigest())
+                    self._built_version = version
+        return self._snapshot
+
+    def categories(self):
+        return self._ensure_built()[0]
+
+    def fingerprint(self):
+        # Changes whenever anything rendered from the tree changes
+        return self._ensure_built()[1]
+
+
+tree = CategoryTree()
+
+
+def get_categories():
+    return tree.categories()
@@ -0,0 +1,36 @@
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from .models import Product, ProductReview
+
+
+RATING_VALUES = [stars for stars, label in ProductReview.REVIEW_STARS]
+
+
+def _rating(stars):
+    return stars if stars in RATING_VALUES else None
+
+
+def update_rating_aggregates(product_id, removed=None, added=None):
+    # Apply one review change to the denormalized counters on Product with a
+    # single UPDATE. Call inside the transaction that writes the review.
+    removed, added = _rating(removed), _rating(added)
+    if removed == added:
+        return
+
+    count_delta = (1 if added else 0) - (1 if removed else 0)
+    sum_delta = int(added or 0) - int(removed or 0)
+
+    changes = {}
+    if removed:
+        changes['rating_' + removed] = F('rating_' + removed) - 1
+    if added:
+        changes['rating_' + added] = F('rating_' + added) + 1
+
+    rating_count = F('rating_count') + count_delta
+    rating_sum = F('rating_sum') + sum_delta
+    changes['rating_average'] = Coalesce(
+        Cast(rating_sum, FloatField()) / NullIf(rating_count, 0), Value(0.0))
+
+    Product.objects.filter(pk=product_id).update(
+        rating_count=rating_count, rating_sum=rating_sum, **changes)
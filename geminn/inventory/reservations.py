@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ProductUnit
+
+
+RELEASE_BATCH_SIZE = 1000
+CLAIM_ATTEMPTS = 3
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product_ids):
+        super().__init__('Not enough units for product(s) {}'.format(
+            ', '.join(str(product_id) for product_id in product_ids)))
+        self.product_ids = product_ids
+
+
+def _free(now):
+    return Q(reserved_until__isnull=True) | Q(reserved_until__lte=now)
+
+
+def _claim(reservation_key, product_id, qty, now, until):
+    # Pick free units without waiting on rows other checkouts are locking,
+    # then claim them with an UPDATE that re-checks they are still free.
+    for attempt in range(CLAIM_ATTEMPTS):
+        candidates = ProductUnit.objects.filter(
+            _free(now), product_id=product_id, is_active=True, sold=False).order_by(
+            '-is_product_default', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True, of=('self',))
+        unit_ids = list(candidates.values_list('id', flat=True)[:qty])
+        if len(unit_ids) < qty:
+            return False
+
+        claimed = ProductUnit.objects.filter(
+            _free(now), id__in=unit_ids, sold=False).update(
+            reserved_until=until, reservation_key=reservation_key)
+        if claimed == qty:
+            return True
+        # Lost a race on some rows: give back what we got and try again
+        ProductUnit.objects.filter(id__in=unit_ids, reservation_key=reservation_key).update(
+            reserved_until=None, reservation_key='')
+    return False
+
+
+def reserve(reservation_key, quantities):
+    # Hold quantities ({product id: qty}) for STOCK_RESERVATION_TTL seconds.
+    # Any earlier hold under the same key is replaced, so calling this again
+    # extends the reservation. All or nothing: raises InsufficientStock.
+    now = timezone.now()
+    until = now + timedelta(seconds=settings.STOCK_RESERVATION_TTL)
+
+    with transaction.atomic():
+        release(reservation_key)
+        short = [product_id for product_id, qty in sorted(quantities.items())
+                 if qty > 0 and not _claim(reservation_key, product_id, qty, now, until)]
+        if short:
+            # Leaving the block with an exception rolls back every claim
+            raise InsufficientStock(short)
+    return until
+
+
+def extend(reservation_key, seconds):
+    # Keep the units still held under reservation_key for another seconds,
+    # whether or not the hold has lapsed, as long as no one claimed them
+    if not reservation_key:
+        return 0
+    return ProductUnit.objects.filter(reservation_key=reservation_key, sold=False).update(
+        reserved_until=timezone.now() + timedelta(seconds=seconds))
+
+
+def reserved_unit_ids(reservation_key):
+    return list(ProductUnit.objects.filter(
+        reservation_key=reservation_key, sold=False,
+        reserved_until__gt=timezone.now()).values_list('id', flat=True))
+
+
+def release(reservation_key):
+    if not reservation_key:
+        return 0
+    return ProductUnit.objects.filter(reservation_key=reservation_key, sold=False).update(
+        reserved_until=None, reservation_key='')
+
+
+def release_expired(batch_size=RELEASE_BATCH_SIZE):
+    # Batched sweep so a large backlog never turns into one long lock
+    released = 0
+    while True:
+        now = timezone.now()
+        unit_ids = list(ProductUnit.objects.filter(
+            reserved_until__lte=now, sold=False).values_list('id', flat=True)[:batch_size])
+        if not unit_ids:
+            return released
+        released += ProductUnit.objects.filter(
+            id__in=unit_ids, reserved_until__lte=now, sold=False).update(
+            reserved_until=None, reservation_key='')
@@ -0,0 +1,229 @@
+import re
+
+from django.db import DatabaseError, connection
+from django.db.models import Q
+
+from geminn.pagination import CursorPaginator
+
+from .listings import product_listing
+
+
+SEARCH_TABLE = 'inventory_product_search'
+RANKED_ORDERING = ('search_score', 'id')
+FALLBACK_ORDERING = ('-updated_at', 'id')
+
+# Title, description, brand, category and specification value columns are
+# weighted by bm25 (SQLite) / setweight (PostgreSQL) so title hits rank first.
+SQLITE_CREATE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+    "title, description, brand, category, specifications, "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+
+SQLITE_INSERT = """
+    INSERT INTO {table} (rowid, title, description, brand, category, specifications)
+    SELECT p.id, p.title, COALESCE(p.description, ''), COALESCE(b.title, ''),
+           c.title || ' ' || COALESCE(s.title, ''),
+           COALESCE((SELECT GROUP_CONCAT(v.value, ' ')
+                     FROM inventory_productspecificationvalue v
+                     WHERE v.product_id = p.id AND v.is_active), '')
+    FROM inventory_product p
+    INNER JOIN inventory_category c ON c.id = p.category_id
+    LEFT JOIN inventory_brand b ON b.id = p.brand_id
+    LEFT JOIN inventory_subcategory s ON s.id = p.sub_category_id
+    WHERE p.is_active {where}
+"""
+
+POSTGRESQL_CREATE = [
+    "CREATE TABLE IF NOT EXISTS {table} ("
+    "product_id bigint PRIMARY KEY REFERENCES inventory_product (id) "
+    "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+    "document tsvector NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS {table}_document_idx ON {table} USING GIN (document)",
+]
+
+POSTGRESQL_INSERT = """
+    INSERT INTO {table} (product_id, document)
+    SELECT p.id,
+           setweight(to_tsvector('simple', p.title), 'A') ||
+           setweight(to_tsvector('simple', COALESCE(b.title, '') || ' ' || c.title || ' ' || COALESCE(s.title, '')), 'B') ||
+           setweight(to_tsvector('simple', COALESCE((SELECT string_agg(v.value, ' ')
+                                                     FROM inventory_productspecificationvalue v
+                                                     WHERE v.product_id = p.id AND v.is_active), '')), 'C') ||
+           setweight(to_tsvector('simple', COALESCE(p.description, '')), 'D')
+    FROM inventory_product p
+    INNER JOIN inventory_category c ON c.id = p.category_id
+    LEFT JOIN inventory_brand b ON b.id = p.brand_id
+    LEFT JOIN inventory_subcategory s ON s.id = p.sub_category_id
+    WHERE p.is_active {where}
+"""
+
+# Every match as an (id, score) row; lower scores rank first on both engines
+MATCHES = {
+    'sqlite': """
+        SELECT rowid AS id, bm25({table}, 10.0, 1.0, 4.0, 4.0, 2.0) AS score
+        FROM {table} WHERE {table} MATCH %s
+    """,
+    'postgresql': """
+        SELECT product_id AS id, -ts_rank(document, query) AS score
+        FROM {table}, to_tsquery('simple', %s) query WHERE document @@ query
+    """,
+}
+
+
+def _vendor(conn=None):
+    return (conn or connection).vendor
+
+
+def _terms(query):
+    return re.findall(r'\w+', query or '')
+
+
+def create_index(conn=None):
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        if _vendor(conn) == 'sqlite':
+            cursor.execute(SQLITE_CREATE.format(table=SEARCH_TABLE))
+        elif _vendor(conn) == 'postgresql':
+            for statement in POSTGRESQL_CREATE:
+                cursor.execute(statement.format(table=SEARCH_TABLE))
+
+
+def drop_index(conn=None):
+    conn = conn or connection
+    if _vendor(conn) in ('sqlite', 'postgresql'):
+        with conn.cursor() as cursor:
+            cursor.execute('DROP TABLE IF EXISTS ' + SEARCH_TABLE)
+
+
+def update_index(product_ids=None, conn=None):
+    # product_ids=None rebuilds the whole index
+    conn = conn or connection
+    vendor = _vendor(conn)
+    if vendor not in ('sqlite', 'postgresql'):
+        return
+
+    key = 'rowid' if vendor == 'sqlite' else 'product_id'
+    insert = SQLITE_INSERT if vendor == 'sqlite' else POSTGRESQL_INSERT
+
+    if product_ids is None:
+        delete_where, insert_where, params = '', '', []
+    else:
+        product_ids = list(product_ids)
+        if not product_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(product_ids))
+        delete_where = ' WHERE {} IN ({})'.format(key, placeholders)
+        insert_where = 'AND p.id IN ({})'.format(placeholders)
+        params = product_ids
+
+    with conn.cursor() as cursor:
+        cursor.execute('DELETE FROM ' + SEARCH_TABLE + delete_where, params)
+        cursor.execute(insert.format(
+            table=SEARCH_TABLE, where=insert_where), params)
+
+
+def remove_from_index(product_ids, conn=None):
+    conn = conn or connection
+    product_ids = list(product_ids)
+    if not product_ids or _vendor(conn) not in ('sqlite', 'postgresql'):
+        return
+
+    key = 'rowid' if _vendor(conn) == 'sqlite' else 'product_id'
+    with conn.cursor() as cursor:
+        cursor.execute('DELETE FROM {} WHERE {} IN ({})'.format(
+            SEARCH_TABLE, key, ', '.join(['%s'] * len(product_ids))), product_ids)
+
+
+def _match(terms, vendor):
+    if vendor == 'sqlite':
+        return ' '.join('"{}"*'.format(term) for term in terms)
+    return ' & '.join('{}:*'.format(term) for term in terms)
+
+
+def _fallback_queryset(terms):
+    condition = Q()
+    for term in terms:
+        condition &= (Q(title__icontains=term) |
+                      Q(description__icontains=term) |
+                      Q(brand__title__icontains=term) |
+                      Q(category__title__icontains=term) |
+                      Q(productspecificationvalue__value__icontains=term))
+
+    return product_listing(condition, is_active=True).distinct()
+
+
+def count_matches(query):
+    terms = _terms(query)
+    if not terms:
+        return 0
+
+    vendor = _vendor()
+    if vendor in MATCHES:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT COUNT(*) FROM ({}) matches'.format(
+                    MATCHES[vendor].format(table=SEARCH_TABLE)), [_match(terms, vendor)])
+                return cursor.fetchone()[0]
+        except DatabaseError:
+            if connection.in_atomic_block:
+                raise
+    return _fallback_queryset(terms).count()
+
+
+class SearchPaginator(CursorPaginator):
+    # Keyset pages over the search engine's own (score, id) ranking, so every
+    # match can be paged to. Products are loaded only for the page's ids.
+    # Without a search engine, matches are paged newest first instead.
+    def __init__(self, query, per_page=24, cursor_param='cursor'):
+        self.terms = _terms(query)
+        self.vendor = _vendor()
+        self.ranked = self.vendor in MATCHES
+        super().__init__(_fallback_queryset(self.terms),
+                         ordering=RANKED_ORDERING if self.ranked else FALLBACK_ORDERING,
+                         per_page=per_page, cursor_param=cursor_param)
+
+    def fetch(self, values, backwards, limit):
+        if not self.terms:
+            return [], None, False
+
+        if self.ranked:
+            try:
+                return self._fetch_ranked(values, backwards, limit)
+            except DatabaseError:
+                if connection.in_atomic_block:
+                    raise
+                # Search index missing: page newest first instead. Cursors
+                # issued in this mode carry over; ranked ones start over.
+                self.ranked = False
+                self.set_ordering(FALLBACK_ORDERING)
+        return super().fetch(values, backwards, limit)
+
+    def _fetch_ranked(self, values, backwards, limit):
+        if values is not None and not (isinstance(values[0], (int, float)) and
+                                       isinstance(values[1], int)):
+            values, backwards = None, False
+
+        sql = 'SELECT id, score FROM ({}) matches'.format(
+            MATCHES[self.vendor].format(table=SEARCH_TABLE))
+        params = [_match(self.terms, self.vendor)]
+        if values is not None:
+            sql += ' WHERE score {0} %s OR (score = %s AND id {0} %s)'.format(
+                '<' if backwards else '>')
+            params += [values[0], values[0], values[1]]
+        sql += ' ORDER BY score {0}, id {0} LIMIT %s'.format('DESC' if backwards else 'ASC')
+        params.append(limit)
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        products = {product.id: product for product in product_listing(
+            id__in=[product_id for product_id, score in rows], is_active=True)}
+        page = []
+        for product_id, score in rows:
+            product = products.get(product_id)
+            if product is not None:
+                product.search_score = score
+                page.append(product)
+        return page, values, backwards
@@ -0,0 +1,107 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import facets, featured, freshness, navigation, search, suggestions
+from .models import Brand, Category, SubCategory, Product, ProductUnit, ProductSpecification, ProductSpecificationValue, ProductReview
+
+
+# Search index
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance.is_active:
+        search.update_index([instance.pk])
+    else:
+        search.remove_from_index([instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    search.remove_from_index([instance.pk])
+
+
+@receiver(post_save, sender=Brand)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=SubCategory)
+def index_related_products(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    field = {Brand: 'brand', Category: 'category',
+             SubCategory: 'sub_category'}[sender]
+    search.update_index(Product.objects.filter(
+        **{field: instance}).values_list('id', flat=True))
+
+
+@receiver(post_save, sender=ProductSpecificationValue)
+@receiver(post_delete, sender=ProductSpecificationValue)
+def index_specification_value(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.update_index([instance.product_id])
+
+
+# Suggestion prefix index
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Brand)
+@receiver(post_save, sender=Category)
+def refresh_suggestion(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    kind = {Product: 'product', Brand: 'brand', Category: 'category'}[sender]
+    suggestions.sync_instance(kind, instance)
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Brand)
+@receiver(post_delete, sender=Category)
+def drop_suggestion(sender, instance, **kwargs):
+    kind = {Product: 'product', Brand: 'brand', Category: 'category'}[sender]
+    suggestions.sync_instance(kind, instance, deleted=True)
+
+
+# Homepage featured pool
+
+@receiver(post_save, sender=ProductUnit)
+@receiver(post_save, sender=ProductReview)
+@receiver(post_delete, sender=ProductUnit)
+@receiver(post_delete, sender=ProductReview)
+def refresh_featured_pool(sender, instance, **kwargs):
+    featured.pool.invalidate()
+
+
+# Facet index
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Brand)
+@receiver(post_save, sender=ProductSpecification)
+@receiver(post_save, sender=ProductSpecificationValue)
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Brand)
+@receiver(post_delete, sender=ProductSpecification)
+@receiver(post_delete, sender=ProductSpecificationValue)
+def refresh_facet_index(sender, instance, **kwargs):
+    facets.index.invalidate()
+
+
+# Category navigation
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=SubCategory)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=SubCategory)
+def refresh_category_tree(sender, instance, **kwargs):
+    navigation.tree.invalidate()
+
+
+# Catalog page validators
+
+def refresh_catalog_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        freshness.catalog_version.bump()
+
+
+for model in freshness.CATALOG_MODELS:
+    receiver([post_save, post_delete], sender=model)(refresh_catalog_version)
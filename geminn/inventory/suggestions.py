@@ -0,0 +1,136 @@
+import re
+import threading
+from bisect import bisect_left, insort
+
+from .models import Brand, Category, Product
+from .versions import SharedVersion
+
+
+SUGGESTION_LIMIT = 8
+
+
+def _normalize(text):
+    return ' '.join(re.findall(r'\w+', (text or '').lower()))
+
+
+class PrefixIndex:
+    # Sorted (key, doc) pairs searched with bisect. Every word of a title
+    # starts a key, so "ring" finds "Emerald ring" as well as "Ring set".
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = []
+        self._docs = {}
+        self.version = None
+
+    def _keys(self, title):
+        words = _normalize(title).split(' ')
+        return {' '.join(words[index:]) for index in range(len(words)) if words[index]}
+
+    def _add(self, doc, title, slug):
+        for key in self._keys(title):
+            insort(self._entries, (key, doc))
+        self._docs[doc] = (title, slug)
+
+    def _remove(self, doc):
+        if doc not in self._docs:
+            return
+        title, slug = self._docs.pop(doc)
+        for key in self._keys(title):
+            position = bisect_left(self._entries, (key, doc))
+            if position < len(self._entries) and self._entries[position] == (key, doc):
+                del self._entries[position]
+
+    def build(self, rows, version):
+        # rows: iterable of (kind, pk, title, slug)
+        entries, docs = [], {}
+        for kind, pk, title, slug in rows:
+            doc = (kind, pk)
+            docs[doc] = (title, slug)
+            entries.extend((key, doc) for key in self._keys(title))
+        entries.sort()
+
+        with self._lock:
+            self._entries, self._docs = entries, docs
+            self.version = version
+
+    def update(self, kind, pk, title, slug):
+        with self._lock:
+            self._remove((kind, pk))
+            self._add((kind, pk), title, slug)
+
+    def remove(self, kind, pk):
+        with self._lock:
+            self._remove((kind, pk))
+
+    def search(self, prefix, limit=SUGGESTION_LIMIT):
+        prefix = _normalize(prefix)
+        if not prefix:
+            return []
+
+        results, seen = [], set()
+        with self._lock:
+            entries = self._entries
+            position = bisect_left(entries, (prefix,))
+            while position < len(entries) and len(results) < limit:
+                key, doc = entries[position]
+                if not key.startswith(prefix):
+                    break
+                if doc not in seen:
+                    seen.add(doc)
+                    title, slug = self._docs[doc]
+                    results.append({'kind': doc[0], 'id': doc[1],
+                                    'title': title, 'slug': slug})
+                position += 1
+        return results
+
+
+index = PrefixIndex()
+version = SharedVersion('suggestions')
+
+SOURCES = (
+    ('product', Product),
+    ('brand', Brand),
+    ('category', Category),
+)
+
+
+def build_index():
+    current = version.get()
+    rows = []
+    for kind, model in SOURCES:
+        rows.extend((kind, pk, title, slug) for pk, title, slug in model.objects.filter(
+            is_active=True).values_list('pk', 'title', 'slug').iterator())
+    index.build(rows, current)
+
+
+def get_index():
+    # Rebuilt when another process has changed the indexed rows
+    if index.version != version.get():
+        build_index()
+    return index
+
+
+def sync_instance(kind, instance, deleted=False):
+    # Once the change commits, patch this process's index and bump the shared
+    # version so the other processes rebuild theirs; a rollback touches neither
+    pk, title, slug = instance.pk, instance.title, instance.slug
+    removed = deleted or not instance.is_active
+
+    def follow(current):
+        built = index.version
+        if built is None:
+            return
+        if removed:
+            index.remove(kind, pk)
+        else:
+            index.update(kind, pk, title, slug)
+        # Our own change is the only one since the build: the patched index
+        # is already current
+        if current == built + 1:
+            index.version = current
+
+    version.bump(follow)
+
+
+def suggest(prefix, limit=SUGGESTION_LIMIT):
+    return get_index().search(prefix, limit)
@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CacheVersion
+
+
+class SharedVersion:
+    # Version of some data cached in every process, kept in the CacheVersion
+    # table so a change made in one process reaches all of them. Writers bump
+    # it once their transaction commits; readers re-read it at most every
+    # CACHE_VERSION_CHECK_INTERVAL seconds and rebuild when it has moved.
+    def __init__(self, name):
+        self.name = name
+        self._value = None
+        self._checked_at = 0.0
+
+    def _read(self):
+        return CacheVersion.objects.filter(name=self.name).values_list(
+            'version', flat=True).first() or 0
+
+    def stamp(self):
+        # (version, time of the last bump), read now rather than throttled
+        return CacheVersion.objects.filter(name=self.name).values_list(
+            'version', 'updated_at').first() or (0, None)
+
+    def get(self):
+        now = time.monotonic()
+        if self._value is None or now - self._checked_at >= settings.CACHE_VERSION_CHECK_INTERVAL:
+            self._value = self._read()
+            self._checked_at = now
+        return self._value
+
+    def bump(self, callback=None):
+        # callback(new_version) runs after the bump, in this process
+        def bump_on_commit():
+            current = self._increment()
+            self._value, self._checked_at = current, time.monotonic()
+            if callback is not None:
+                callback(current)
+
+        transaction.on_commit(bump_on_commit)
+
+    def _increment(self):
+        increment = {'version': F('version') + 1, 'updated_at': timezone.now()}
+        if not CacheVersion.objects.filter(name=self.name).update(**increment):
+            try:
+                with transaction.atomic():
+                    CacheVersion.objects.create(name=self.name, version=1)
+            except IntegrityError:
+                # Another process created the row first
+                CacheVersion.objects.filter(name=self.name).update(**increment)
+        return self._read()
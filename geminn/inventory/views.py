@@ -2,6 +2,7 @@ from datetime import datetime
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.http import HttpResponse, HttpResponseRedirect
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
@@ -10,6 +11,7 @@ from django.utils.translation import gettext_lazy as _
 
 from .models import Brand, Discount, Category, SubCategory, Product, ProductUnit, ProductUnitImage, ProductSpecification, ProductSpecificationValue, ProductReview
 from .forms import BrandForm, DiscountForm, CategoryForm, SubCategoryForm, ProductForm, ProductUnitForm, ProductSpecificationForm, ProductSpecificationValueForm, ProductUnitImageForm, ProductReviewForm
+from .ratings import RATING_VALUES, update_rating_aggregates
 
 
 # Brands
@@ -642,13 +644,21 @@ def add_product_review(request, product_slug):
     return redirect('inventory:view_product', product.slug)
 
 
+def _locked_review(product_review_id):
+    # (pk, current stars) of an active review, row locked until the
+    # transaction ends; None when another request has removed it meanwhile.
+    # Stars may be None for a review left without a rating.
+    return ProductReview.objects.select_for_update().filter(
+        pk=product_review_id, is_active=True).values_list('pk', 'stars').first()
+
+
 @login_required
 def update_product_review(request, product_slug, product_review_slug):
     product_review = get_object_or_404(
         ProductReview, slug=product_review_slug, product__slug=product_slug, is_active=True)
 
     if request.method == 'POST':
-        if product_review.user != request.user:
+        if product_review.added_by != request.user:
             messages.warning(
                 request, 'User is allowed to update only reviews belonging to them.')
             return redirect('inventory:view_product', product_slug)
@@ -656,7 +666,18 @@ def update_product_review(request, product_slug, product_review_slug):
             product_review_form = ProductReviewForm(
                 instance=product_review, data=request.POST)
             if product_review_form.is_valid():
-                product_review_form.save()
+                product_review = product_review_form.save(commit=False)
+                if request.POST.get('rating') in RATING_VALUES:
+                    product_review.stars = request.POST['rating']
+
+                with transaction.atomic():
+                    # Lock the row so concurrent edits apply their deltas
+                    # one after another, each against the stars it replaces
+                    locked = _locked_review(product_review.pk)
+                    if locked is not None:
+                        product_review.save()
+                        update_rating_aggregates(
+                            product_review.product_id, removed=locked[1], added=product_review.stars)
                 return redirect('inventory:view_product', product_slug)
     else:
 
@@ -668,17 +689,21 @@ def delete_product_review(request, product_slug, product_review_slug):
     product_review = get_object_or_404(
         ProductReview, slug=product_review_slug, product__slug=product_slug, is_active=True)
 
-    if product_review.user != request.user:
+    if product_review.added_by != request.user:
         messages.warning(
             request, 'User is allowed to update only reviews belonging to them.')
         return redirect('inventory:view_product', product_slug)
     else:
-        product_review = ProductReview.objects.get(
-            slug=product_review_slug, product__slug=product_slug)
         product_review.is_active = False
         product_review.deleted_at = datetime.now()
-        product_review.save()
-        messages.success(request, 'Product Review removed')
+        with transaction.atomic():
+            locked = _locked_review(product_review.pk)
+            if locked is not None:
+                product_review.save()
+                update_rating_aggregates(
+                    product_review.product_id, removed=locked[1])
+        if locked is not None:
+            messages.success(request, 'Product Review removed')
     return redirect('inventory:view_product', product_slug)
 
 
@@ -792,7 +817,10 @@ def add_product_review(request, product_slug):
                 product_review.product = product
                 product_review.added_by = request.user
 
-                product_review.save()
+                with transaction.atomic():
+                    product_review.save()
+                    update_rating_aggregates(
+                        product.id, added=product_review.stars)
 
                 messages.success(
                     request, 'Your review has been added')
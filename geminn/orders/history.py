@@ -0,0 +1,27 @@
+from django.db.models import Prefetch
+
+from geminn.pagination import CursorPaginator
+from inventory.listings import default_image_prefetch
+
+from .models import Order, OrderItem
+
+
+# Newest first; matches the order_user_billed_created_idx index
+HISTORY_ORDERING = ('-created_at', '-id')
+HISTORY_PER_PAGE = 10
+
+
+def order_history(user):
+    # Paid orders with their items, products and default images: one query
+    # for the orders, one for items joined to products and one for images,
+    # however many orders and items a page holds
+    items = OrderItem.objects.select_related('product').prefetch_related(
+        default_image_prefetch('product__product')).order_by('id')
+
+    return Order.objects.filter(user=user, billing_status=True).prefetch_related(
+        Prefetch('items', queryset=items))
+
+
+def order_history_page(request, per_page=HISTORY_PER_PAGE):
+    return CursorPaginator(order_history(request.user), ordering=HISTORY_ORDERING,
+                           per_page=per_page).get_page(request)
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:34
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def rename_duplicate_order_keys(apps, schema_editor):
+    # Earlier check-then-insert code could store the same key twice. Keep the
+    # oldest order on the key and suffix the rest so the constraint applies.
+    Order = apps.get_model('orders', 'Order')
+    duplicated = Order.objects.values('order_key').annotate(
+        count=Count('id')).filter(count__gt=1).values_list('order_key', flat=True)
+    for order_key in duplicated:
+        for order in Order.objects.filter(order_key=order_key).order_by('created_at', 'id')[1:]:
+            order.order_key = '{}-duplicate-{}'.format(order_key, order.pk)[:200]
+            order.save(update_fields=['order_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicate_order_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='order',
+            name='order_key',
+            field=models.CharField(max_length=200, unique=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:36
+
+from django.db import migrations, models
+
+
+def mark_billed_orders_paid(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    Order.objects.filter(billing_status=True).update(payment_status='paid')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_order_key_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='payment_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('paid', 'Paid'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='reservation_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(mark_billed_orders_paid, migrations.RunPython.noop),
+    ]
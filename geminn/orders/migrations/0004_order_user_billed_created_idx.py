@@ -0,0 +1,17 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_payment_status'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', 'billing_status', '-created_at'], name='order_user_billed_created_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.1 on 2026-10-18 09:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_order_user_billed_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='units_short',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from decimal import Decimal
 
+from django.conf import settings
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from accounts.models import UserModel
@@ -7,6 +8,15 @@ from inventory.models import Product
 
 
 class Order(models.Model):
+    PENDING = 'pending'
+    PAID = 'paid'
+    FAILED = 'failed'
+    PAYMENT_STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (PAID, 'Paid'),
+        (FAILED, 'Failed'),
+    ]
+
     full_name = models.CharField(max_length=50)
     email = models.EmailField(max_length=254, blank=True)
     address1 = models.CharField(max_length=250)
@@ -16,9 +26,17 @@ class Order(models.Model):
     postal_code = models.CharField(max_length=20)
     country_code = models.CharField(max_length=4, blank=True)
     total_paid = models.DecimalField(max_digits=5, decimal_places=2)
-    order_key = models.CharField(max_length=200)
+    currency = models.CharField(max_length=3, default=settings.DEFAULT_CURRENCY)
+    order_key = models.CharField(max_length=200, unique=True)
     payment_option = models.CharField(max_length=200, blank=True)
     billing_status = models.BooleanField(default=False)
+    payment_status = models.CharField(
+        max_length=10, choices=PAYMENT_STATUS_CHOICES, default=PENDING)
+    reservation_key = models.CharField(
+        max_length=64, blank=True, default='', editable=False)
+    # Ordered units that were no longer held when the order was paid; a
+    # non-zero value needs a refund or backorder by hand
+    units_short = models.PositiveIntegerField(default=0)
     user = models.ForeignKey(
         UserModel, on_delete=models.CASCADE, related_name='order_user')
     created_at = models.DateTimeField(
@@ -28,6 +46,10 @@ class Order(models.Model):
 
     class Meta:
         ordering = ('-created_at',)
+        indexes = [
+            models.Index(fields=['user', 'billing_status', '-created_at'],
+                         name='order_user_billed_created_idx'),
+        ]
 
     def __str__(self):
         return str(self.created_at)
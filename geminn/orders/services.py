@@ -0,0 +1,104 @@
+import logging
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from inventory import reservations
+from inventory.freshness import catalog_version
+from inventory.models import ProductUnit
+
+from .models import Order, OrderItem
+
+
+logger = logging.getLogger(__name__)
+
+
+def create_order(bag, reservation_key=None, **order_fields):
+    # Order, all of its items and the units it sells are written together:
+    # one INSERT for the order, one bulk INSERT for the items and one UPDATE
+    # for the units held under reservation_key, whatever the bag size.
+    #
+    # order_key is unique, so the order INSERT doubles as the idempotency
+    # check: a retried or concurrent callback for the same key fails on the
+    # index and gets the existing order back. Returns (order, created).
+    #
+    # Orders that are not paid yet keep their units on hold under
+    # reservation_key until settle_payment() sells or releases them; the hold
+    # is extended past the checkout TTL so expiry sweeps and other checkouts
+    # leave those units alone while the payment is verified.
+    if not order_fields.get('order_key'):
+        raise ValueError('An order needs an order_key')
+    lines = list(bag)
+
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                order = Order.objects.create(reservation_key=reservation_key or '', **order_fields)
+        except IntegrityError:
+            existing = Order.objects.filter(order_key=order_fields['order_key']).first()
+            if existing is None:
+                # Some other constraint failed, not the order_key one
+                raise
+            return existing, False
+
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=line.product, price=line.price.amount, quantity=line.qty)
+            for line in lines
+        ])
+        if reservation_key and order.payment_status == Order.PAID:
+            quantities = Counter()
+            for line in lines:
+                quantities[line.product.id] += line.qty
+            _sell_units(order, quantities)
+        elif reservation_key:
+            reservations.extend(reservation_key, settings.PENDING_ORDER_RESERVATION_TTL)
+    return order, True
+
+
+def settle_payment(order_key, paid, **order_fields):
+    # Move a pending order to paid or failed, writing order_fields with it.
+    # Only the first settlement wins, so repeated verifications are no-ops.
+    # Returns whether this call settled the order.
+    with transaction.atomic():
+        order = Order.objects.select_for_update().filter(
+            order_key=order_key, payment_status=Order.PENDING).first()
+        if order is None:
+            return False
+
+        Order.objects.filter(pk=order.pk).update(
+            payment_status=Order.PAID if paid else Order.FAILED,
+            billing_status=paid, updated_at=timezone.now(), **order_fields)
+        if paid:
+            _sell_units(order, dict(order.items.values_list('product_id').annotate(Sum('quantity'))))
+        else:
+            reservations.release(order.reservation_key)
+    return True
+
+
+def _sell_units(order, quantities):
+    # Sell the units held for order, up to the quantity ordered of each
+    # product ({product id: qty}), in one UPDATE; anything else still held
+    # under its key goes back to stock. A hold that lapsed and was claimed
+    # elsewhere leaves the order short, and it is flagged rather than passed
+    # off as fulfilled.
+    if not order.reservation_key:
+        return
+    held = ProductUnit.objects.filter(reservation_key=order.reservation_key, sold=False)
+    wanted = [Q(pk__in=held.filter(product_id=product_id).order_by('id').values('pk')[:qty])
+              for product_id, qty in quantities.items() if qty > 0]
+    sold = ProductUnit.objects.filter(reduce(or_, wanted)).update(
+        sold=True, reserved_until=None) if wanted else 0
+    reservations.release(order.reservation_key)
+
+    quantity = sum(quantities.values())
+    if sold < quantity:
+        order.units_short = quantity - sold
+        Order.objects.filter(pk=order.pk).update(units_short=order.units_short)
+        logger.warning('Order %s paid with %d of %d units in stock', order.order_key, sold, quantity)
+    # Stock shown on catalog pages changed without a model signal
+    catalog_version.bump()
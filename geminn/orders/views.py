@@ -2,7 +2,7 @@ from django.http.response import JsonResponse
 from django.shortcuts import render
 from bag.bag import Bag
 
-from .models import Order, OrderItem
+from .services import create_order, settle_payment
 
 
 def add(request):
@@ -10,37 +10,27 @@ def add(request):
     if request.POST.get("action") == "post":
 
         order_key = request.POST.get("order_key")
+        if not order_key:
+            return JsonResponse({"error": "Missing order_key"}, status=400)
         user_id = request.user.id
         bagtotal = bag.get_total_price()
 
-        # Check if order exists
-        if Order.objects.filter(order_key=order_key).exists():
-            pass
-        else:
-            order = Order.objects.create(
-                user_id=user_id,
-                full_name="name",
-                address1="add1",
-                address2="add2",
-                total_paid=bagtotal,
-                order_key=order_key,
-            )
-            order_id = order.pk
-
-            for item in bag:
-                OrderItem.objects.create(
-                    order_id=order_id, product=item["product"], price=item["price"], quantity=item["qty"]
-                )
+        # Duplicate posts for the same key return the existing order
+        create_order(
+            bag,
+            reservation_key=request.session.get("reservation_key"),
+            user_id=user_id,
+            full_name="name",
+            address1="add1",
+            address2="add2",
+            total_paid=bagtotal.amount,
+            currency=bagtotal.currency,
+            order_key=order_key,
+        )
 
         response = JsonResponse({"success": "Return something"})
         return response
 
 
 def payment_confirmation(data):
-    Order.objects.filter(order_key=data).update(billing_status=True)
-
-
-def user_orders(request):
-    user_id = request.user.id
-    orders = Order.objects.filter(user_id=user_id).filter(billing_status=True)
-    return orders
+    settle_payment(data, paid=True)
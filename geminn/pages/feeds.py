@@ -0,0 +1,156 @@
+import csv
+from xml.sax.saxutils import escape
+
+from django.core.files.storage import default_storage
+from django.db.models import Exists, OuterRef, Subquery
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+
+from inventory.models import Category, SubCategory, Product, ProductUnit, ProductUnitImage
+
+
+# Everything here is streamed from chunked iterators so memory stays flat
+# however large the catalog grows.
+SITEMAP_LIMIT = 50000
+CHUNK_SIZE = 2000
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+SITEMAP_NAMESPACE = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+STATIC_PAGES = ('pages:index', 'pages:categories',
+                'pages:products', 'pages:contact_us')
+
+FEED_FIELDS = ('id', 'title', 'description', 'link', 'image_link',
+               'price', 'availability', 'brand')
+
+
+def _lastmod(updated_at):
+    return '<lastmod>{}</lastmod>'.format(updated_at.date().isoformat()) if updated_at else ''
+
+
+def _page_entries():
+    # Static pages, categories and sub-categories: one small shard
+    for name in STATIC_PAGES:
+        yield reverse(name), None
+
+    for model, name, argument in ((Category, 'pages:category', 'category_slug'),
+                                  (SubCategory, 'pages:sub_category', 'sub_category_slug')):
+        for slug, updated_at in model.objects.filter(is_active=True).order_by('id').values_list(
+                'slug', 'updated_at').iterator(chunk_size=CHUNK_SIZE):
+            yield reverse(name, kwargs={argument: slug}), updated_at
+
+
+def _product_entries(start=0, stop=None):
+    products = Product.objects.filter(is_active=True).order_by(
+        'id').values_list('slug', 'updated_at')[start:stop]
+    for slug, updated_at in products.iterator(chunk_size=CHUNK_SIZE):
+        yield reverse('pages:product', args=[slug]), updated_at
+
+
+def _page_count():
+    return (len(STATIC_PAGES) + Category.objects.filter(is_active=True).count() +
+            SubCategory.objects.filter(is_active=True).count())
+
+
+def _urlset(request, *entry_streams):
+    yield XML_HEADER + '<urlset xmlns="{}">\n'.format(SITEMAP_NAMESPACE)
+    for entries in entry_streams:
+        for location, updated_at in entries:
+            yield '<url><loc>{}</loc>{}</url>\n'.format(
+                escape(request.build_absolute_uri(location)), _lastmod(updated_at))
+    yield '</urlset>\n'
+
+
+def _sitemap_index(request, product_shards):
+    yield XML_HEADER + '<sitemapindex xmlns="{}">\n'.format(SITEMAP_NAMESPACE)
+    yield '<sitemap><loc>{}</loc></sitemap>\n'.format(escape(request.build_absolute_uri(
+        reverse('pages:sitemap_section', args=['pages', 1]))))
+    for shard in range(1, product_shards + 1):
+        yield '<sitemap><loc>{}</loc></sitemap>\n'.format(escape(request.build_absolute_uri(
+            reverse('pages:sitemap_section', args=['products', shard]))))
+    yield '</sitemapindex>\n'
+
+
+def _xml_response(stream):
+    return StreamingHttpResponse(stream, content_type='application/xml; charset=utf-8')
+
+
+def sitemap(request):
+    product_count = Product.objects.filter(is_active=True).count()
+
+    if _page_count() + product_count <= SITEMAP_LIMIT:
+        return _xml_response(_urlset(request, _page_entries(), _product_entries()))
+
+    product_shards = -(-product_count // SITEMAP_LIMIT)
+    return _xml_response(_sitemap_index(request, product_shards))
+
+
+def sitemap_section(request, section, shard):
+    if section == 'pages' and shard == 1:
+        return _xml_response(_urlset(request, _page_entries()))
+
+    if section == 'products' and shard >= 1:
+        start = (shard - 1) * SITEMAP_LIMIT
+        if not Product.objects.filter(is_active=True).order_by('id')[start:start + 1].exists():
+            raise Http404
+        return _xml_response(_urlset(request, _product_entries(start, start + SITEMAP_LIMIT)))
+
+    raise Http404
+
+
+def _feed_rows(request):
+    default_image = ProductUnitImage.objects.filter(
+        product=OuterRef('pk'), is_product_unit_default=True, is_active=True).order_by(
+        '-updated_at', '-id').values('image')[:1]
+    in_stock = ProductUnit.objects.filter(
+        product=OuterRef('pk'), is_active=True, sold=False)
+
+    products = Product.objects.filter(is_active=True).order_by('id').annotate(
+        default_image=Subquery(default_image), in_stock=Exists(in_stock)).values_list(
+        'id', 'title', 'description', 'slug', 'default_image', 'retail_price',
+        'retail_price_unit', 'in_stock', 'brand__title')
+
+    for (product_id, title, description, slug, image, retail_price,
+         retail_price_unit, in_stock, brand) in products.iterator(chunk_size=CHUNK_SIZE):
+        yield {
+            'id': product_id,
+            'title': title,
+            'description': description or '',
+            'link': request.build_absolute_uri(reverse('pages:product', args=[slug])),
+            'image_link': request.build_absolute_uri(default_storage.url(image)) if image else '',
+            'price': '{} {}'.format(retail_price, retail_price_unit or '').strip() if retail_price is not None else '',
+            'availability': 'in stock' if in_stock else 'out of stock',
+            'brand': brand or '',
+        }
+
+
+class Echo:
+    # csv.writer target that hands each line back instead of buffering it
+    def write(self, value):
+        return value
+
+
+def _csv_feed(request):
+    writer = csv.writer(Echo())
+    yield writer.writerow(FEED_FIELDS)
+    for row in _feed_rows(request):
+        yield writer.writerow([row[field] for field in FEED_FIELDS])
+
+
+def _xml_feed(request):
+    yield XML_HEADER + ('<rss version="2.0" xmlns:g="http://base.google.com/ns/1.0">\n'
+                        '<channel>\n<title>GEM-INN</title>\n<link>{}</link>\n'
+                        '<description>GEM-INN product feed</description>\n').format(
+        escape(request.build_absolute_uri(reverse('pages:index'))))
+    for row in _feed_rows(request):
+        yield '<item>{}</item>\n'.format(''.join(
+            '<g:{0}>{1}</g:{0}>'.format(field, escape(str(row[field]))) for field in FEED_FIELDS))
+    yield '</channel>\n</rss>\n'
+
+
+def product_feed(request, feed_format):
+    if feed_format == 'csv':
+        response = StreamingHttpResponse(_csv_feed(request), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = 'inline; filename="products.csv"'
+        return response
+    return _xml_response(_xml_feed(request))
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 app_name = 'pages'
 
@@ -13,5 +13,13 @@ urlpatterns = [
     path('products/', views.products, name='products'),
     path('product/<slug:product_slug>/', views.product, name='product'),
     path('lookup/', views.lookup, name='lookup'),
+    path('lookup/suggest/', views.suggest, name='suggest'),
     path('contact-us/', views.contact_us, name='contact_us'),
+    path('sitemap.xml', feeds.sitemap, name='sitemap'),
+    path('sitemaps/<slug:section>/<int:shard>.xml',
+         feeds.sitemap_section, name='sitemap_section'),
+    path('feeds/products.csv', feeds.product_feed,
+         {'feed_format': 'csv'}, name='product_feed_csv'),
+    path('feeds/products.xml', feeds.product_feed,
+         {'feed_format': 'xml'}, name='product_feed_xml'),
 ]
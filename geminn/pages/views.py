@@ -1,17 +1,54 @@
-from django.db.models import Q
-from django.shortcuts import get_object_or_404, redirect, render
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
+from django.utils.http import urlencode
+from geminn.conditional import conditional_page
+from geminn.pagination import CursorPaginator
+
+from inventory.models import ProductUnit, Category, SubCategory, ProductReview
+
+from inventory import featured
+from inventory.details import load_product_detail
+from inventory.facets import index as facet_index
+from inventory.freshness import catalog_state
+from inventory.navigation import get_categories, tree as category_tree
+from inventory.forms import ProductReviewForm
+from inventory.listings import product_listing, product_unit_listing
+from inventory.search import SearchPaginator, count_matches
+from inventory.suggestions import suggest as suggest_titles
 
-from inventory.models import Product, ProductUnit, ProductUnitImage, ProductSpecification, ProductSpecificationValue, Category, SubCategory, ProductReview
 
-from inventory.forms import ProductReviewForm
+PRODUCT_ORDERINGS = {
+    'latest': ('-updated_at', 'id'),
+    'rating': ('-rating_average', 'id'),
+}
+
+PRODUCT_UNIT_ORDERINGS = {
+    'latest': ('-updated_at', 'id'),
+    'rating': ('-product__rating_average', 'id'),
+}
+
+
+def listing_ordering(request, orderings):
+    return orderings.get(request.GET.get('sort'), orderings['latest'])
+
+
+def catalog_page_state(request, *args, **kwargs):
+    version, updated_at = catalog_state()
+    return version, updated_at, category_tree.fingerprint()
 
 
 def index(request):
+    # Sample from the precomputed pool and fetch the chosen rows by key
+    product_unit_ids = featured.pool.product_unit_ids(1)
     product_units = ProductUnit.objects.prefetch_related(
-        'product_unit_image').filter(is_active=True).order_by('?')[:1]
+        'product_unit_image').filter(pk__in=product_unit_ids, is_active=True)
 
-    product_reviews = ProductReview.objects.filter(
-        is_active=True).order_by('?')[:10]
+    product_review_ids = featured.pool.product_review_ids(10)
+    product_reviews = sorted(
+        ProductReview.objects.select_related('added_by').filter(
+            pk__in=product_review_ids, is_active=True),
+        key=lambda review: product_review_ids.index(review.pk))
 
     return render(request, 'pages/index.html', {
         'product_units': product_units,
@@ -20,123 +57,105 @@ def index(request):
 
 
 def categories(request):
-    categories = Category.objects.all()
-    sub_categories = SubCategory.objects.all()
-
     return render(request, 'pages/categories.html', {
-        'categories': categories,
-        'sub_categories': sub_categories
+        'categories': get_categories()
     })
 
 
+def faceted_products(request, base_key, **filters):
+    selection, facets = facet_index.navigate(
+        base_key, request.GET.getlist('facet'))
+    queryset = product_listing(**filters)
+    if selection is not None:
+        queryset = queryset.filter(selection)
+
+    products = CursorPaginator(queryset, ordering=listing_ordering(
+        request, PRODUCT_ORDERINGS)).get_page(request)
+    return products, facets
+
+
+@conditional_page(catalog_page_state)
 def category(request, category_slug):
     category = get_object_or_404(Category, slug=category_slug, is_active=True)
     sub_categories_belonging_to_category = SubCategory.objects.filter(
         category__slug=category_slug, is_active=True)
-    products_belonging_to_category = Product.objects.filter(
-        category__slug=category_slug, is_active=True).order_by('-updated_at')
-
-    product_unit_images = ProductUnitImage.objects.filter(
-        is_product_unit_default=True, is_active=True)
+    products_belonging_to_category, facets = faceted_products(
+        request, 'category:{}'.format(category.id), category=category, is_active=True)
 
     return render(request, 'pages/category.html', {
         'category': category,
         'sub_categories_belonging_to_category': sub_categories_belonging_to_category,
         'products_belonging_to_category': products_belonging_to_category,
-        'product_unit_images': product_unit_images
+        'facets': facets,
+        'page': products_belonging_to_category
     })
 
 
+@conditional_page(catalog_page_state)
 def sub_category(request, sub_category_slug):
     sub_category = get_object_or_404(
         SubCategory, slug=sub_category_slug, is_active=True)
-    products_belonging_to_sub_category = Product.objects.filter(
-        sub_category__slug=sub_category_slug, is_active=True).order_by('-updated_at')
-
-    product_unit_images = ProductUnitImage.objects.filter(
-        is_product_unit_default=True, is_active=True)
+    products_belonging_to_sub_category, facets = faceted_products(
+        request, 'sub_category:{}'.format(sub_category.id), sub_category=sub_category, is_active=True)
 
     return render(request, 'pages/sub_category.html', {
         'sub_category': sub_category,
         'products_belonging_to_sub_category': products_belonging_to_sub_category,
-        'product_unit_images': product_unit_images
+        'facets': facets,
+        'page': products_belonging_to_sub_category
     })
 
 
+@conditional_page(catalog_page_state)
 def products(request):
-    product_units = ProductUnit.objects.filter(is_product_default=True,
-                                               is_active=True).order_by('-updated_at')
-    product_unit_images = ProductUnitImage.objects.filter(
-        is_product_unit_default=True, is_active=True)
+    product_units = CursorPaginator(product_unit_listing(
+        is_product_default=True, is_active=True), ordering=listing_ordering(request, PRODUCT_UNIT_ORDERINGS)).get_page(request)
 
     return render(request, 'pages/products.html', {
         'product_units': product_units,
-        'product_unit_images': product_unit_images
+        'page': product_units
     })
 
 
+@conditional_page(catalog_page_state)
 def product(request, product_slug):
-    product = get_object_or_404(Product, slug=product_slug, is_active=True)
-
-    product_unit_count = ProductUnit.objects.filter(
-        product__slug=product_slug).count()
-
-    product_specifications = ProductSpecification.objects.filter(product__slug=product_slug, is_active=True).order_by(
-        '-updated_at')
-
-    # for product_specification in product_specifications:
-    #     related_product_specification_values = ProductSpecificationValue.objects.filter(product_specification__slug=product_specification.slug, is_active=True).order_by(
-    #         '-updated_at')
-
-    related_product_specification_values = ProductSpecificationValue.objects.filter(product__slug=product_slug, is_active=True).order_by(
-        '-updated_at')
-
-    product_unit_images = ProductUnitImage.objects.filter(
-        product__slug=product_slug, is_active=True).order_by('-is_product_unit_default')[:6]
-
-    product_unit_image_default_for_product = ProductUnitImage.objects.filter(
-        product__slug=product_slug, is_active=True).order_by('-is_product_unit_default').first()
-
-    product_reviews = ProductReview.objects.filter(product__slug=product_slug, is_active=True).order_by(
-        '-updated_at')
-
+    product_detail = load_product_detail(product_slug)
     product_review_form = ProductReviewForm()
 
     return render(request, 'pages/product.html', {
-        'product': product,
-        'product_unit_count': product_unit_count,
-        'product_specifications': product_specifications,
-        'product_unit_images': product_unit_images,
-        'product_unit_image_default_for_product': product_unit_image_default_for_product,
-        'related_product_specification_values': related_product_specification_values,
-        'product_reviews': product_reviews,
+        **product_detail,
         'product_review_form': product_review_form
     })
 
 
 def lookup(request):
-    if request.method == 'GET':
-
-        query = request.GET.get('search')
+    query = request.GET.get('search', '')
 
-        product_units = ProductUnit.objects.filter(
-            Q(product__slug__icontains=query) |
-            Q(product__title__icontains=query) |
-            Q(product__description__icontains=query)
-        )
-
-        products_count = product_units.count()
-
-    product_unit_images = ProductUnitImage.objects.filter(
-        is_product_unit_default=True, is_active=True)
+    products_count = count_matches(query)
+    products = SearchPaginator(query).get_page(request)
 
     return render(request, 'pages/lookup.html', {
         'query': query,
-        'product_units': product_units,
+        'products': products,
         'products_count': products_count,
-        'product_unit_images': product_unit_images
+        'page': products
     })
 
 
+def suggest(request):
+    suggestions = suggest_titles(request.GET.get('q', ''))
+
+    for suggestion in suggestions:
+        if suggestion['kind'] == 'product':
+            suggestion['url'] = reverse('pages:product', args=[suggestion['slug']])
+        elif suggestion['kind'] == 'category':
+            suggestion['url'] = reverse('pages:category', args=[suggestion['slug']])
+        else:
+            suggestion['url'] = reverse('pages:lookup') + '?' + urlencode(
+                {'search': suggestion['title']})
+
+    return JsonResponse({'suggestions': suggestions})
+
+
 def contact_us(request):
     return render(request, 'pages/contact_us.html')
@@ -0,0 +1,8 @@
+# Gunicorn settings for the Procfile web process
+
+
+def post_worker_init(worker):
+    # The Django app is loaded by now; fill its in-process caches
+    from geminn.warmup import warm_caches
+
+    warm_caches()